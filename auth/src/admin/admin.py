@@ -2,21 +2,29 @@ import typer
 import asyncio
 from sqlalchemy import select
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.sqlalchemy import User, UserRoles, Role
+from db.engine import create_engine
+from db.migrations import upgrade_schema
 from core.config import settings
+from services.password import get_password_service
 import models.role
 
 
 app = typer.Typer()
 
-engine = create_async_engine(settings.get_connection_string(), echo=True)
+engine = create_engine(settings)
 async_session = sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
 )
 
 
+@app.command(name='migrate')
+def migrate_command():
+    upgrade_schema()
+
+
 @app.command(name='setup-roles')
 def setup_roles_command():
     async def setup_roles():
@@ -31,11 +39,12 @@ def setup_roles_command():
 @app.command(name='setup-admin')
 def setup_admin_command():
     async def setup_user():
+        password_service = get_password_service()
         async with async_session() as session:
             async with session.begin():
                 admin = User(
                     login=settings.default_admin_login,
-                    password=settings.default_admin_password,
+                    pass_hash=await password_service.hash_password(settings.default_admin_password),
                     first_name='admin',
                     last_name='admin'
                 )
@@ -8,6 +8,7 @@ from fastapi.security import OAuth2PasswordBearer
 from models.user import UserResponse, UserCreateRequest
 from services.user import UserService, get_user_service
 from services.token import TokenService, get_token_service
+from services.password import PasswordServiceBusyError
 
 
 router = APIRouter()
@@ -21,7 +22,10 @@ async def register(
 ) -> UserResponse:
     if await user_service.get_by_login(request.login):
         raise HTTPException(HTTPStatus.CONFLICT, 'The login already exists')
-    return await user_service.create_user(request)
+    try:
+        return await user_service.create_user(request)
+    except PasswordServiceBusyError:
+        raise HTTPException(HTTPStatus.SERVICE_UNAVAILABLE, 'Too many requests, try again later')
 
 
 @router.post('/login/')
@@ -31,52 +35,72 @@ async def login(
         user_service: Annotated[UserService, Depends(get_user_service)],
         token_service: Annotated[TokenService, Depends(get_token_service)]
 ) -> dict[str, str]:
-    user = await user_service.get_by_login(login)
-    if not user or not (await user_service.check_password(user.id, password)):
-        raise HTTPException(HTTPStatus.UNAUTHORIZED, 'Invalid credentials')
+    user = await user_service.get_with_roles_by_login(login)
+    try:
+        if not user or not (await user_service.check_password(user, password)):
+            raise HTTPException(HTTPStatus.UNAUTHORIZED, 'Invalid credentials')
+    except PasswordServiceBusyError:
+        raise HTTPException(HTTPStatus.SERVICE_UNAVAILABLE, 'Too many requests, try again later')
+    roles = [role.title for role in user.roles]
     return {
-        'access_token': token_service.create_access_token(user.id),
-        'refresh_token': token_service.create_refresh_token(user.id),
+        'access_token': token_service.create_access_token(user.id, roles),
+        'refresh_token': await token_service.create_refresh_token(user.id),
     }
 
 
 @router.post('/refresh/')
-def refresh(
+async def refresh(
         refresh_token: Annotated[str, Depends(oauth2_scheme)],
+        user_service: Annotated[UserService, Depends(get_user_service)],
         token_service: Annotated[TokenService, Depends(get_token_service)]
 ) -> dict[str, str]:
-    token_subject = _get_token_subject(refresh_token, token_service)
-    if token_service.is_refresh_token_revoked(token_subject, refresh_token):
+    payload = _get_token_payload(refresh_token, token_service)
+    token_subject = payload.get('sub')
+    new_refresh_token = await token_service.rotate_refresh_token(payload, refresh_token)
+    if not new_refresh_token:
         raise HTTPException(HTTPStatus.UNAUTHORIZED, 'Invalid refresh token')
-    token_service.revoke_refresh_token(token_subject, refresh_token)
+    if not (user := await user_service.get_with_roles(int(token_subject))):
+        raise HTTPException(HTTPStatus.UNAUTHORIZED, 'Invalid refresh token')
+    roles = [role.title for role in user.roles]
     return {
-        'access_token': token_service.create_access_token(token_subject),
-        'refresh_token': token_service.create_refresh_token(token_subject),
+        'access_token': token_service.create_access_token(token_subject, roles),
+        'refresh_token': new_refresh_token,
     }
 
 
 @router.post('/logout/')
-def logout(
+async def logout(
         access_token: Annotated[str, Depends(oauth2_scheme)],
         refresh_token: Annotated[str, Header()],
         token_service: Annotated[TokenService, Depends(get_token_service)]
 ):
     invalid_token_error = HTTPException(HTTPStatus.UNAUTHORIZED)
-    access_token_subject = _get_token_subject(access_token, token_service)
-    if token_service.is_access_token_revoked(access_token_subject, access_token):
-        raise invalid_token_error
-    refresh_token_subject = _get_token_subject(refresh_token, token_service)
-    if token_service.is_refresh_token_revoked(refresh_token_subject, refresh_token):
+    access_payload = _get_token_payload(access_token, token_service)
+    refresh_payload = _get_token_payload(refresh_token, token_service)
+    if access_payload.get('sub') != refresh_payload.get('sub'):
         raise invalid_token_error
-    if access_token_subject != refresh_token_subject:
+    if not await token_service.is_token_pair_active(
+            access_payload, access_token, refresh_payload, refresh_token
+    ):
         raise invalid_token_error
-    token_service.revoke_access_token(access_token_subject, access_token)
-    token_service.revoke_refresh_token(refresh_token_subject, refresh_token)
+    await token_service.revoke_token_pair(access_payload, access_token, refresh_payload, refresh_token)
+    return Response(status_code=HTTPStatus.NO_CONTENT)
+
+
+@router.post('/logout-all/')
+async def logout_all(
+        access_token: Annotated[str, Depends(oauth2_scheme)],
+        token_service: Annotated[TokenService, Depends(get_token_service)]
+):
+    access_payload = _get_token_payload(access_token, token_service)
+    if await token_service.is_access_token_revoked(access_payload, access_token):
+        raise HTTPException(HTTPStatus.UNAUTHORIZED)
+    await token_service.revoke_all_tokens(access_payload, access_token)
     return Response(status_code=HTTPStatus.NO_CONTENT)
 
 
-def _get_token_subject(token: str, token_service: TokenService):
+def _get_token_payload(token: str, token_service: TokenService):
     try:
-        return token_service.get_payload(token).get('sub')
+        return token_service.get_payload(token)
     except (JWTError, ExpiredSignatureError):
         raise HTTPException(HTTPStatus.UNAUTHORIZED, 'Invalid token')
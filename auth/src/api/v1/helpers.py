@@ -1,13 +1,13 @@
 from http import HTTPStatus
 from typing import Annotated
 
-import aiohttp
 from jose import jwt
 from jose.exceptions import JWTError
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
 from core.config import settings
+from services.token import TokenService, get_token_service
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/register/')
@@ -25,13 +25,18 @@ def get_user_id(token: Annotated[str, Depends(oauth2_scheme)]):
 
 
 def require(role: str):
-    async def wrapper(user_id: Annotated[str, Depends(get_user_id)]):
-        url = f'{settings.check_role_url}/{user_id}/{role}'
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status >= HTTPStatus.BAD_REQUEST:
-                    raise HTTPException(HTTPStatus.UNAUTHORIZED)
-                response = await response.json()
-                if not response['belongs']:
-                    raise HTTPException(HTTPStatus.UNAUTHORIZED)
+    async def wrapper(
+            token: Annotated[str, Depends(oauth2_scheme)],
+            token_service: Annotated[TokenService, Depends(get_token_service)]
+    ):
+        try:
+            payload = token_service.get_payload(token)
+        except JWTError:
+            raise HTTPException(HTTPStatus.UNAUTHORIZED)
+        if role not in payload.get('roles', []):
+            raise HTTPException(HTTPStatus.UNAUTHORIZED)
+        if await token_service.is_access_token_revoked(payload, token):
+            raise HTTPException(HTTPStatus.UNAUTHORIZED)
+        if await token_service.are_role_claims_stale(payload):
+            raise HTTPException(HTTPStatus.UNAUTHORIZED, 'Roles have changed, refresh the token')
     return wrapper
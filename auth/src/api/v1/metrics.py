@@ -0,0 +1,22 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from db.engine import get_engine, get_pool_stats
+from services.role import membership_cache
+from services.revocation import revocation_filter
+
+
+router = APIRouter()
+
+
+@router.get('/')
+async def get_metrics(
+        engine: Annotated[AsyncEngine, Depends(get_engine)]
+) -> dict[str, dict[str, float]]:
+    return {
+        'db_pool': get_pool_stats(engine),
+        'role_membership_cache': membership_cache.get_stats(),
+        'revocation_filter': revocation_filter.get_stats(),
+    }
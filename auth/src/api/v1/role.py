@@ -6,7 +6,6 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.exc import IntegrityError
 
 from services.role import RoleService, get_role_service
-from services.user import UserService, get_user_service
 from api.v1.helpers import require
 from models.role import Role
 
@@ -47,15 +46,16 @@ async def grant_role(
         user_id: int,
         role_id: int,
         role_service: Annotated[RoleService, Depends(get_role_service)],
-        user_service: Annotated[UserService, Depends(get_user_service)],
         _: Annotated[None, Depends(require(Role.MODERATOR.value))]
 ):
-    if not (await user_service.get_by_id(user_id)):
+    membership = await role_service.get_membership(user_id, role_id)
+    if not membership.user_exists:
         raise HTTPException(HTTPStatus.NOT_FOUND, 'User not found')
-    if not (await role_service.get_by_id(role_id)):
+    if not membership.role_exists:
         raise HTTPException(HTTPStatus.NOT_FOUND, 'Role not found')
     try:
-        await role_service.grant_role(user_id, role_id)
+        if not membership.has_role:
+            await role_service.grant_role(user_id, role_id)
         return {'user_id': user_id, 'role_id': role_id}
     except IntegrityError:
         raise HTTPException(HTTPStatus.BAD_REQUEST)
@@ -66,15 +66,16 @@ async def revoke_role(
         user_id: int,
         role_id: int,
         role_service: Annotated[RoleService, Depends(get_role_service)],
-        user_service: Annotated[UserService, Depends(get_user_service)],
         _: Annotated[None, Depends(require(Role.MODERATOR.value))]
 ):
-    if not (await user_service.get_by_id(user_id)):
+    membership = await role_service.get_membership(user_id, role_id)
+    if not membership.user_exists:
         raise HTTPException(HTTPStatus.NOT_FOUND, 'User not found')
-    if not (await role_service.get_by_id(role_id)):
+    if not membership.role_exists:
         raise HTTPException(HTTPStatus.NOT_FOUND, 'Role not found')
     try:
-        await role_service.revoke_role(user_id, role_id)
+        if membership.has_role:
+            await role_service.revoke_role(user_id, role_id)
         return Response(status_code=HTTPStatus.NO_CONTENT)
     except IntegrityError:
         raise HTTPException(HTTPStatus.BAD_REQUEST)
@@ -84,11 +85,11 @@ async def revoke_role(
 async def has_role(
         user_id: int,
         role_title: str,
-        role_service: Annotated[RoleService, Depends(get_role_service)],
-        user_service: Annotated[UserService, Depends(get_user_service)]
+        role_service: Annotated[RoleService, Depends(get_role_service)]
 ):
-    if not (await user_service.get_by_id(user_id)):
+    membership = await role_service.get_membership_by_title(user_id, role_title)
+    if not membership.user_exists:
         raise HTTPException(HTTPStatus.NOT_FOUND, 'User not found')
-    if not (role := await role_service.get_by_title(role_title)):
+    if membership.role_id is None:
         raise HTTPException(HTTPStatus.NOT_FOUND, 'Role not found')
-    return {'belongs': await role_service.has_role(user_id, role.id)}
+    return {'belongs': membership.has_role}
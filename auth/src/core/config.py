@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,6 +12,17 @@ class Settings(BaseSettings):
     jwt_sign_algorithm: str = Field(..., alias='JWT_SIGN_ALGORITHM')
     token_storage_host: str = Field('auth-tokens', alias='TOKEN_STORAGE_HOST')
     token_storage_port: int = Field(6379, alias='TOKEN_STORAGE_PORT')
+    token_storage_max_connections: int = Field(64, alias='TOKEN_STORAGE_MAX_CONNECTIONS')
+    revocation_filter_capacity: int = Field(100_000, alias='REVOCATION_FILTER_CAPACITY')
+    revocation_filter_error_rate: float = Field(0.001, alias='REVOCATION_FILTER_ERROR_RATE')
+    revocation_filter_rebuild_seconds: float = Field(60, alias='REVOCATION_FILTER_REBUILD_SECONDS')
+    role_cache_size: int = Field(10_000, alias='ROLE_CACHE_SIZE')
+    role_cache_ttl_seconds: float = Field(30, alias='ROLE_CACHE_TTL_SECONDS')
+    password_hash_method: str = Field('scrypt:32768:8:1', alias='PASSWORD_HASH_METHOD')
+    password_salt_length: int = Field(16, alias='PASSWORD_SALT_LENGTH')
+    password_hash_executor: Literal['thread', 'process'] = Field('thread', alias='PASSWORD_HASH_EXECUTOR')
+    password_hash_workers: int = Field(2, alias='PASSWORD_HASH_WORKERS')
+    password_hash_queue_size: int = Field(32, alias='PASSWORD_HASH_QUEUE_SIZE')
     default_admin_login: str = Field(..., alias='DEFAULT_ADMIN_LOGIN')
     default_admin_password: str = Field(..., alias='DEFAULT_ADMIN_PASSWORD')
     database_user: str = Field(..., alias='POSTGRES_USER')
@@ -17,10 +30,30 @@ class Settings(BaseSettings):
     database_name: str = Field(..., alias='POSTGRES_DB')
     database_host: str = Field('database', alias='POSTGRES_HOST')
     database_port: int = Field(5432, alias='POSTGRES_PORT')
-    check_role_url: str = Field('http://auth:8000/role/belongs', alias='CHECK_ROLE_URL')
+    database_echo: bool = Field(False, alias='DATABASE_ECHO')
+    database_pool_size: int | None = Field(None, alias='DATABASE_POOL_SIZE')
+    database_connection_budget: int = Field(80, alias='DATABASE_CONNECTION_BUDGET')
+    database_max_overflow: int = Field(5, alias='DATABASE_MAX_OVERFLOW')
+    database_pool_timeout: float = Field(30, alias='DATABASE_POOL_TIMEOUT')
+    database_pool_recycle: int = Field(1800, alias='DATABASE_POOL_RECYCLE')
+    database_pool_pre_ping: bool = Field(True, alias='DATABASE_POOL_PRE_PING')
+    database_statement_cache_size: int = Field(100, alias='DATABASE_STATEMENT_CACHE_SIZE')
+    database_migration_mode: Literal['verify', 'upgrade', 'skip'] = Field('verify', alias='DATABASE_MIGRATION_MODE')
+    alembic_config_path: str = Field('alembic.ini', alias='ALEMBIC_CONFIG_PATH')
+    web_concurrency: int = Field(4, alias='WEB_CONCURRENCY')
 
     def get_connection_string(self):
-        return f'postgresql+asyncpg://{self.database_user}:{self.database_password}@{self.database_host}/{self.database_name}'
+        return f'postgresql+asyncpg://{self.database_user}:{self.database_password}@{self.database_host}:{self.database_port}/{self.database_name}'
+
+    def get_sync_connection_string(self):
+        return f'postgresql+psycopg2://{self.database_user}:{self.database_password}@{self.database_host}:{self.database_port}/{self.database_name}'
+
+    def get_pool_size(self):
+        # DATABASE_CONNECTION_BUDGET is what one replica may hold in total,
+        # shared by its WEB_CONCURRENCY workers, overflow included.
+        if self.database_pool_size is not None:
+            return self.database_pool_size
+        return max(1, self.database_connection_budget // self.web_concurrency - self.database_max_overflow)
 
 
 settings = Settings()
@@ -0,0 +1,71 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.config import Settings
+
+
+@dataclass
+class CheckoutStats:
+    checkouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+# Module level rather than per pool instance: SQLAlchemy rebuilds the pool
+# object on dispose(), and the numbers should survive that.
+checkout_stats = CheckoutStats()
+engine: AsyncEngine | None = None
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            checkout_stats.record(time.perf_counter() - started)
+
+
+def create_engine(settings: Settings) -> AsyncEngine:
+    return create_async_engine(
+        settings.get_connection_string(),
+        echo=settings.database_echo,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.get_pool_size(),
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=settings.database_pool_pre_ping,
+        connect_args={
+            'prepared_statement_cache_size': settings.database_statement_cache_size,
+            'statement_cache_size': settings.database_statement_cache_size,
+        }
+    )
+
+
+def get_engine() -> AsyncEngine:
+    return engine
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict[str, float]:
+    pool = engine.sync_engine.pool
+    return {
+        'size': pool.size(),
+        'in_use': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'checkouts': checkout_stats.checkouts,
+        'checkout_wait_avg_ms': (
+            checkout_stats.total_wait / checkout_stats.checkouts * 1000
+            if checkout_stats.checkouts else 0.0
+        ),
+        'checkout_wait_max_ms': checkout_stats.max_wait * 1000,
+    }
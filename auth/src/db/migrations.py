@@ -0,0 +1,57 @@
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+
+
+# Arbitrary application-wide key for pg_advisory_lock.
+MIGRATION_LOCK_ID = 7_250_131
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def get_alembic_config() -> Config:
+    return Config(settings.alembic_config_path)
+
+
+def upgrade_schema() -> None:
+    """Upgrades the database to head.
+
+    The advisory lock makes concurrently starting replicas wait for each
+    other instead of racing to apply the same revisions.
+    """
+    alembic_cfg = get_alembic_config()
+    engine = create_engine(settings.get_sync_connection_string(), poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text('SELECT pg_advisory_lock(:lock_id)'), {'lock_id': MIGRATION_LOCK_ID})
+            connection.commit()
+            try:
+                alembic_cfg.attributes['connection'] = connection
+                command.upgrade(alembic_cfg, 'head')
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:lock_id)'), {'lock_id': MIGRATION_LOCK_ID})
+                connection.commit()
+    finally:
+        engine.dispose()
+
+
+async def verify_schema(engine: AsyncEngine) -> None:
+    heads = set(ScriptDirectory.from_config(get_alembic_config()).get_heads())
+    try:
+        async with engine.connect() as connection:
+            current = set(await connection.scalars(text('SELECT version_num FROM alembic_version')))
+    except DBAPIError:
+        current = set()
+    if current != heads:
+        raise SchemaVersionError(
+            f'Database schema is at {sorted(current) or "no revision"}, expected {sorted(heads)}. '
+            'Run `python -m admin.admin migrate` first.'
+        )
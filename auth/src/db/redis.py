@@ -1,5 +1,5 @@
 from typing import Optional
-from redis import Redis
+from redis.asyncio import Redis
 
 
 redis: Optional[Redis] = None
@@ -1,7 +1,6 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, sessionmaker, relationship
 from sqlalchemy.ext.declarative import declarative_base
-from werkzeug.security import check_password_hash, generate_password_hash
 
 
 Base = declarative_base()
@@ -18,18 +17,20 @@ class User(Base):
 
     roles = relationship('Role', back_populates='users', secondary='user_roles')
 
-    def __init__(self, login: str, password: str, first_name: str, last_name: str) -> None:
+    def __init__(self, login: str, first_name: str, last_name: str, pass_hash: str) -> None:
+        # Hashed through services.password, off the event loop.
         self.login = login
-        self.pass_hash = generate_password_hash(password)
+        self.pass_hash = pass_hash
         self.first_name = first_name
         self.last_name = last_name
 
-    def check_password(self, password: str) -> bool:
-        return check_password_hash(self.pass_hash, password)
-
 
 class UserRoles(Base):
     __tablename__ = 'user_roles'
+    __table_args__ = (
+        Index('ix_user_roles_user_id_role_id', 'user_id', 'role_id', unique=True),
+        Index('ix_user_roles_role_id', 'role_id'),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
     role_id: Mapped[int] = mapped_column(ForeignKey('roles.id'))
@@ -1,33 +1,45 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
-from redis import Redis
-from alembic import command
-from alembic.config import Config
+from redis.asyncio import Redis, BlockingConnectionPool
 
-from db import sqlalchemy, redis
-from api.v1 import auth, role
+from db import sqlalchemy, redis, engine, migrations
+from api.v1 import auth, role, metrics
 from core.config import settings
+from services.role import listen_for_role_changes
+from services.revocation import maintain_revocation_filter
 
 
-engine = create_async_engine(settings.get_connection_string(), echo=True)
+engine.engine = engine.create_engine(settings)
 sqlalchemy.async_session = sessionmaker(
-    engine, expire_on_commit=False, class_=AsyncSession
+    engine.engine, expire_on_commit=False, class_=AsyncSession
 )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    redis.redis = Redis(
+    redis.redis = Redis(connection_pool=BlockingConnectionPool(
         host=settings.token_storage_host,
-        port=settings.token_storage_port
-    )
-    alembic_cfg = Config("alembic.ini")
-    command.upgrade(alembic_cfg, "head")
+        port=settings.token_storage_port,
+        max_connections=settings.token_storage_max_connections
+    ))
+    # Migrations belong to `python -m admin.admin migrate`, run once per
+    # deployment; workers only check that it has happened.
+    if settings.database_migration_mode == 'upgrade':
+        await asyncio.to_thread(migrations.upgrade_schema)
+    elif settings.database_migration_mode == 'verify':
+        await migrations.verify_schema(engine.engine)
+    background_tasks = [
+        asyncio.create_task(listen_for_role_changes(redis.redis)),
+        asyncio.create_task(maintain_revocation_filter(redis.redis)),
+    ]
     yield
-    redis.redis.close()
+    for task in background_tasks:
+        task.cancel()
+    await redis.redis.close(close_connection_pool=True)
 
 
 app = FastAPI(
@@ -38,3 +50,4 @@ app = FastAPI(
 
 app.include_router(auth.router, prefix='/auth', tags=['auth'])
 app.include_router(role.router, prefix='/role', tags=['role'])
+app.include_router(metrics.router, prefix='/metrics', tags=['metrics'])
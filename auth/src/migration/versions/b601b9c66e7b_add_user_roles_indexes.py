@@ -0,0 +1,41 @@
+"""Add user_roles indexes
+
+Revision ID: b601b9c66e7b
+Revises: 9f50462c4bc3
+Create Date: 2026-10-18 20:15:53.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b601b9c66e7b'
+down_revision: Union[str, None] = '9f50462c4bc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Grants used to be insertable twice; keep the oldest row of every pair
+    # so that the unique index can be built.
+    op.execute(
+        """
+        DELETE FROM user_roles
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (PARTITION BY user_id, role_id ORDER BY id) AS row_number
+                FROM user_roles
+            ) AS numbered
+            WHERE numbered.row_number > 1
+        )
+        """
+    )
+    op.create_index('ix_user_roles_user_id_role_id', 'user_roles', ['user_id', 'role_id'], unique=True)
+    op.create_index('ix_user_roles_role_id', 'user_roles', ['role_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_roles_role_id', table_name='user_roles')
+    op.drop_index('ix_user_roles_user_id_role_id', table_name='user_roles')
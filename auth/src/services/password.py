@@ -0,0 +1,54 @@
+import asyncio
+from functools import lru_cache
+from typing import Any, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from core.config import settings
+
+
+class PasswordServiceBusyError(Exception):
+    pass
+
+
+class PasswordService:
+    def __init__(self, executor: Executor, max_pending: int, method: str, salt_length: int):
+        self.executor = executor
+        self.max_pending = max_pending
+        self.method = method
+        self.salt_length = salt_length
+        self._pending = 0
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    async def check_password(self, pass_hash: str, password: str) -> bool:
+        return await self._run(check_password_hash, pass_hash, password)
+
+    def needs_rehash(self, pass_hash: str) -> bool:
+        # werkzeug hashes read {method}${salt}${hash}.
+        parts = pass_hash.split('$', 2)
+        return len(parts) != 3 or parts[0] != self.method or len(parts[1]) != self.salt_length
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Hashing is deliberately slow, so rather than queueing without bound
+        # and letting every caller time out, reject work once the pool is full.
+        if self._pending >= self.max_pending:
+            raise PasswordServiceBusyError
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._pending -= 1
+
+
+@lru_cache()
+def get_password_service() -> PasswordService:
+    executor_class = ProcessPoolExecutor if settings.password_hash_executor == 'process' else ThreadPoolExecutor
+    return PasswordService(
+        executor_class(max_workers=settings.password_hash_workers),
+        settings.password_hash_workers + settings.password_hash_queue_size,
+        settings.password_hash_method,
+        settings.password_salt_length
+    )
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from time import monotonic
+
+from redis.asyncio import Redis
+
+from core.bloom import BloomFilter
+from core.config import settings
+from services.token_storage import RedisTokenStorageService, REVOKED_ACCESS_KEYS_CHANNEL
+
+
+class RevocationFilter:
+    """In-memory prefilter for revoked access token keys.
+
+    A negative answer is final, so the token storage is only asked about
+    keys the filter reports as possibly revoked. Until the filter has been
+    built from Redis every key is reported as possibly revoked.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ready = False
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.checks = 0
+        self.positives = 0
+        self.false_positives = 0
+
+    def might_be_revoked(self, key: str) -> bool:
+        if not self.ready:
+            return True
+        self.checks += 1
+        if key in self.bloom:
+            self.positives += 1
+            return True
+        return False
+
+    def record_false_positive(self) -> None:
+        if self.ready:
+            self.false_positives += 1
+
+    def add(self, key: str) -> None:
+        self.bloom.add(key)
+
+    def rebuild(self, keys: list[str]) -> None:
+        bloom = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        self.bloom = bloom
+        self.ready = True
+
+    def get_stats(self) -> dict[str, float]:
+        return {
+            'ready': self.ready,
+            'entries': self.bloom.count,
+            'memory_bytes': self.bloom.memory_bytes,
+            'estimated_false_positive_rate': self.bloom.false_positive_rate,
+            'checks': self.checks,
+            'positives': self.positives,
+            'false_positives': self.false_positives,
+            'observed_false_positive_rate': (
+                self.false_positives / (self.checks - self.positives + self.false_positives)
+                if self.checks - self.positives + self.false_positives else 0.0
+            ),
+        }
+
+
+revocation_filter = RevocationFilter(
+    settings.revocation_filter_capacity,
+    settings.revocation_filter_error_rate
+)
+
+
+async def maintain_revocation_filter(redis: Redis):
+    """Feeds revocation_filter from Redis: live via pub/sub, and by periodic
+    rebuilds that drop expired keys and cover anything missed."""
+    storage = RedisTokenStorageService(redis)
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                # Subscribe before reading the registry so nothing falls in between.
+                await pubsub.subscribe(REVOKED_ACCESS_KEYS_CHANNEL)
+                revocation_filter.rebuild(await storage.get_revoked_access_keys())
+                rebuild_at = monotonic() + settings.revocation_filter_rebuild_seconds
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=max(rebuild_at - monotonic(), 0)
+                    )
+                    if message:
+                        revocation_filter.add(message['data'].decode())
+                    if monotonic() >= rebuild_at:
+                        revocation_filter.rebuild(await storage.get_revoked_access_keys())
+                        rebuild_at = monotonic() + settings.revocation_filter_rebuild_seconds
+        except Exception:
+            # Whatever broke the updates, the filter may now miss revocations,
+            # so every key goes to Redis until it has been rebuilt.
+            revocation_filter.ready = False
+            logging.exception('Revocation filter update failed, resubscribing')
+            await asyncio.sleep(1)
@@ -1,55 +1,137 @@
+import asyncio
+import logging
 from typing import Annotated
 
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import Row, select, delete, exists
 from fastapi import Depends
 
-from db.sqlalchemy import get_session, Role, UserRoles
+from core.cache import TTLCache
+from core.config import settings
+from db.redis import get_redis
+from db.sqlalchemy import get_session, Role, User, UserRoles
+from services.token import TokenService, get_token_service
+
+
+ROLE_CHANGES_CHANNEL = 'role-changes'
+ALL_ROLES_CHANGED = '*'
+
+# Per worker; entries are keyed by (user_id, role_title).
+membership_cache = TTLCache(settings.role_cache_size, settings.role_cache_ttl_seconds)
 
 
 class RoleService:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, token_service: TokenService, redis: Redis):
         self.db_session = db_session
+        self.token_service = token_service
+        self.redis = redis
 
     async def create_role(self, role_title: str):
         role = Role(title=role_title)
         self.db_session.add(role)
         await self.db_session.commit()
+        await self._publish_change(ALL_ROLES_CHANGED)
         return role
 
     async def delete_role(self, role_id: int):
         stmt = delete(Role).filter_by(id=role_id)
         await self.db_session.execute(stmt)
         await self.db_session.commit()
+        await self._publish_change(ALL_ROLES_CHANGED)
 
     async def grant_role(self, user_id: int, role_id: int):
         user_role = UserRoles(user_id=user_id, role_id=role_id)
         self.db_session.add(user_role)
+        # Marked before the commit, so that no change is applied while Redis is down.
+        await self.token_service.revoke_role_claims(str(user_id))
         await self.db_session.commit()
+        await self._publish_change(str(user_id))
         return user_role
 
     async def revoke_role(self, user_id: int, role_id: int):
         stmt = delete(UserRoles).filter_by(user_id=user_id, role_id=role_id)
         await self.db_session.execute(stmt)
+        await self.token_service.revoke_role_claims(str(user_id))
         await self.db_session.commit()
+        await self._publish_change(str(user_id))
+
+    async def get_membership(self, user_id: int, role_id: int) -> Row:
+        """Resolves user existence, role existence and membership in one query."""
+        query = select(
+            exists().where(User.id == user_id).label('user_exists'),
+            exists().where(Role.id == role_id).label('role_exists'),
+            exists().where(
+                UserRoles.user_id == user_id,
+                UserRoles.role_id == role_id
+            ).label('has_role')
+        )
+        return (await self.db_session.execute(query)).one()
 
-    async def has_role(self, user_id: int, role_id: int):
-        query = (
-            select(UserRoles)
-            .filter_by(role_id=role_id, user_id=user_id)
+    async def get_membership_by_title(self, user_id: int, role_title: str) -> Row:
+        """Same as get_membership, but the role is identified by its title.
+
+        Answers are cached per worker, except for unknown users, so that a
+        freshly registered user is not reported missing until the TTL ends.
+        """
+        if membership := membership_cache.get((user_id, role_title)):
+            return membership
+        query = select(
+            exists().where(User.id == user_id).label('user_exists'),
+            select(Role.id).filter_by(title=role_title).scalar_subquery().label('role_id'),
+            exists().where(
+                UserRoles.user_id == user_id,
+                UserRoles.role_id == Role.id,
+                Role.title == role_title
+            ).label('has_role')
         )
-        return bool(await self.db_session.scalar(query))
+        membership = (await self.db_session.execute(query)).one()
+        if membership.user_exists:
+            membership_cache.set((user_id, role_title), membership)
+        return membership
 
     async def get_by_id(self, role_id: int):
-        query = select(Role).filter_by(id=role_id)
-        return await self.db_session.scalar(query)
+        return await self.db_session.get(Role, role_id)
+
+    async def _publish_change(self, change: str):
+        _apply_role_change(change)
+        try:
+            if change != ALL_ROLES_CHANGED:
+                # Marked again for tokens minted while the change was committed.
+                await self.token_service.revoke_role_claims(change)
+            await self.redis.publish(ROLE_CHANGES_CHANNEL, change)
+        except RedisError:
+            # The change is committed; other workers catch up within the cache TTL.
+            logging.exception('Failed to publish a role change')
+
+
+def _apply_role_change(change: str):
+    if change == ALL_ROLES_CHANGED:
+        membership_cache.clear()
+    else:
+        membership_cache.evict(lambda key: str(key[0]) == change)
+
 
-    async def get_by_title(self, role_title: str):
-        query = select(Role).filter_by(title=role_title)
-        return await self.db_session.scalar(query)
+async def listen_for_role_changes(redis: Redis):
+    """Keeps membership_cache in sync with role changes made by other workers."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(ROLE_CHANGES_CHANNEL)
+                # Changes published while we were not subscribed are lost.
+                membership_cache.clear()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        _apply_role_change(message['data'].decode())
+        except RedisError:
+            logging.exception('Role changes subscription failed, resubscribing')
+            await asyncio.sleep(1)
 
 
 def get_role_service(
-        db_session: Annotated[AsyncSession, Depends(get_session)]
+        db_session: Annotated[AsyncSession, Depends(get_session)],
+        token_service: Annotated[TokenService, Depends(get_token_service)],
+        redis: Annotated[Redis, Depends(get_redis)]
 ) -> RoleService:
-    return RoleService(db_session)
+    return RoleService(db_session, token_service, redis)
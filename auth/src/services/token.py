@@ -1,3 +1,5 @@
+from time import time
+from uuid import uuid4
 from typing import Union, Any, Annotated
 from datetime import datetime, timedelta
 
@@ -6,47 +8,117 @@ from fastapi import Depends
 
 from core.config import settings
 from services.token_storage import TokenStorageService, get_token_storage_service
+from services.revocation import revocation_filter
 
 
 class TokenService:
+    """Issues JWTs and tracks their revocation.
+
+    Tokens carry a ``jti`` claim that names them in the token storage.
+    Tokens issued before it existed have no ``jti`` and are still looked up
+    under the old ``{subject}_{token}`` keys; that fallback can go once
+    ``REFRESH_TOKEN_EXPIRE_MINUTES`` have passed since the switch.
+    """
+
     def __init__(self, token_storage_service: TokenStorageService):
         self.token_storage_service = token_storage_service
 
-    def create_access_token(self, subject: Union[str, Any]) -> str:
+    def create_access_token(self, subject: Union[str, Any], roles: list[str]) -> str:
         return self._create_jwt_token(
             subject,
-            settings.access_token_expire_minutes
+            settings.access_token_expire_minutes,
+            roles=roles,
+            iat=time()
         )
 
-    def create_refresh_token(self, subject: str) -> str:
+    async def create_refresh_token(self, subject: str) -> str:
+        token_id = self._create_token_id()
         token = self._create_jwt_token(
             subject,
-            settings.refresh_token_expire_minutes
-        )
-        self.token_storage_service.add_refresh_token(
-            self._get_storage_key(subject, token),
-            token
+            settings.refresh_token_expire_minutes,
+            jti=token_id
         )
+        await self.token_storage_service.add_refresh_token(subject, token_id)
         return token
 
-    def _create_jwt_token(self, subject: Union[str, Any], expires_delta: int) -> str:
+    async def rotate_refresh_token(self, payload: dict[str, Any], token: str) -> str | None:
+        subject = payload.get('sub')
+        new_token_id = self._create_token_id()
+        new_token = self._create_jwt_token(
+            subject,
+            settings.refresh_token_expire_minutes,
+            jti=new_token_id
+        )
+        if token_id := payload.get('jti'):
+            replaced = await self.token_storage_service.replace_refresh_token(
+                subject,
+                token_id,
+                new_token_id
+            )
+        elif await self._is_logged_out(payload):
+            replaced = False
+        else:
+            replaced = await self.token_storage_service.remove_token(
+                self._get_legacy_storage_key(subject, token)
+            )
+            if replaced:
+                await self.token_storage_service.add_refresh_token(subject, new_token_id)
+        return new_token if replaced else None
+
+    def _create_jwt_token(self, subject: Union[str, Any], expires_delta: int, **claims: Any) -> str:
         expires_delta = datetime.now() + timedelta(minutes=expires_delta)
         return jwt.encode(
-            {"exp": expires_delta, "sub": str(subject)},
+            {"jti": self._create_token_id(), **claims, "exp": expires_delta, "sub": str(subject)},
             settings.jwt_secret_key,
             settings.jwt_sign_algorithm
         )
 
-    def revoke_access_token(self, subject: str, token: str) -> None:
-        self.token_storage_service.add_access_token(
-            self._get_storage_key(subject, token),
-            token
+    def _create_token_id(self) -> str:
+        return uuid4().hex
+
+    async def revoke_token_pair(
+            self,
+            access_payload: dict[str, Any],
+            access_token: str,
+            refresh_payload: dict[str, Any],
+            refresh_token: str
+    ) -> None:
+        subject = refresh_payload.get('sub')
+        access_key = self._get_access_storage_key(access_payload, access_token)
+        # Other workers learn of the revocation over pub/sub; this one must
+        # not wait for its own message.
+        revocation_filter.add(access_key)
+        if refresh_token_id := refresh_payload.get('jti'):
+            await self.token_storage_service.revoke_token_pair(access_key, subject, refresh_token_id)
+            return
+        await self.token_storage_service.add_access_token(access_key)
+        await self.token_storage_service.remove_token(
+            self._get_legacy_storage_key(subject, refresh_token)
         )
 
-    def revoke_refresh_token(self, subject: str, token: str) -> None:
-        self.token_storage_service.remove_token(
-            self._get_storage_key(subject, token)
+    async def revoke_all_tokens(self, access_payload: dict[str, Any], access_token: str) -> None:
+        """Revokes the given access token and every refresh token of its subject.
+
+        Other access tokens of the subject stay valid until they expire.
+        Refresh tokens without a ``jti`` are kept under one key each, so they
+        are revoked by a "logged out at" mark instead.
+        """
+        subject = access_payload.get('sub')
+        access_key = self._get_access_storage_key(access_payload, access_token)
+        revocation_filter.add(access_key)
+        await self.token_storage_service.add_access_token(access_key)
+        await self.token_storage_service.set_logged_out_at(self._get_logged_out_storage_key(subject), time())
+        await self.token_storage_service.remove_refresh_tokens(subject)
+
+    async def _is_logged_out(self, refresh_payload: dict[str, Any]) -> bool:
+        logged_out_at = await self.token_storage_service.get_logged_out_at(
+            self._get_logged_out_storage_key(refresh_payload.get('sub'))
         )
+        if logged_out_at is None:
+            return False
+        # Legacy refresh tokens carry no iat, but all of them lived as long.
+        issued_at = refresh_payload.get('exp', 0) - settings.refresh_token_expire_minutes * 60
+        return issued_at < logged_out_at
 
     def get_payload(self, token: str) -> dict[str, Any]:
         return jwt.decode(
@@ -55,21 +127,64 @@ class TokenService:
             settings.jwt_sign_algorithm
         )
 
-    def is_access_token_revoked(self, subject: str, token: str) -> bool:
-        return self._exists(subject, token)
+    async def is_access_token_revoked(self, payload: dict[str, Any], token: str) -> bool:
+        key = self._get_access_storage_key(payload, token)
+        if not revocation_filter.might_be_revoked(key):
+            return False
+        revoked = bool(await self.token_storage_service.get_token(key))
+        if not revoked:
+            revocation_filter.record_false_positive()
+        return revoked
+
+    async def is_token_pair_active(
+            self,
+            access_payload: dict[str, Any],
+            access_token: str,
+            refresh_payload: dict[str, Any],
+            refresh_token: str
+    ) -> bool:
+        subject = refresh_payload.get('sub')
+        access_key = self._get_access_storage_key(access_payload, access_token)
+        if refresh_token_id := refresh_payload.get('jti'):
+            return await self.token_storage_service.is_token_pair_active(
+                access_key,
+                subject,
+                refresh_token_id
+            )
+        revoked_access_token, stored_refresh_token = await self.token_storage_service.get_tokens(
+            access_key,
+            self._get_legacy_storage_key(subject, refresh_token)
+        )
+        return not revoked_access_token and bool(stored_refresh_token)
 
-    def is_refresh_token_revoked(self, subject, token: str) -> bool:
-        return not self._exists(subject, token)
+    async def revoke_role_claims(self, subject: str) -> None:
+        await self.token_storage_service.set_roles_updated_at(
+            self._get_roles_storage_key(subject),
+            time()
+        )
 
-    def _exists(self, subject: str, token: str) -> bool:
-        token = self.token_storage_service.get_token(
-            self._get_storage_key(subject, token)
+    async def are_role_claims_stale(self, payload: dict[str, Any]) -> bool:
+        roles_updated_at = await self.token_storage_service.get_roles_updated_at(
+            self._get_roles_storage_key(payload.get('sub'))
         )
-        return bool(token)
+        if roles_updated_at is None:
+            return False
+        return payload.get('iat', 0) < roles_updated_at
+
+    def _get_access_storage_key(self, payload: dict[str, Any], token: str) -> str:
+        if token_id := payload.get('jti'):
+            return f'revoked:{token_id}'
+        return self._get_legacy_storage_key(payload.get('sub'), token)
 
-    def _get_storage_key(self, subject: str, token: str):
+    def _get_legacy_storage_key(self, subject: str, token: str) -> str:
         return f'{subject}_{token}'
 
+    def _get_roles_storage_key(self, subject: str):
+        return f'{subject}_roles_updated_at'
+
+    def _get_logged_out_storage_key(self, subject: str):
+        return f'{subject}_logged_out_at'
+
 
 def get_token_service(
     token_storage_service: Annotated[TokenStorageService, Depends(get_token_storage_service)]
@@ -1,46 +1,182 @@
+from time import time
 from typing import Annotated
 from abc import ABC, abstractmethod
 
-from redis import Redis
+from redis.asyncio import Redis
 from fastapi import Depends
 
 from db.redis import get_redis
 from core.config import settings
 
 
+# Revoked access token keys scored by expiry, mirrored into every
+# worker's revocation filter (see services.revocation).
+REVOKED_ACCESS_KEYS = 'revoked_access_keys'
+REVOKED_ACCESS_KEYS_CHANNEL = 'revoked-access-keys'
+
+
 class TokenStorageService(ABC):
     @abstractmethod
-    def add_access_token(self, key, token) -> None:
+    async def add_access_token(self, key) -> None:
+        pass
+
+    @abstractmethod
+    async def add_refresh_token(self, subject, token_id) -> None:
+        pass
+
+    @abstractmethod
+    async def get_token(self, key) -> str:
+        pass
+
+    @abstractmethod
+    async def get_tokens(self, *keys) -> list[str | None]:
+        pass
+
+    @abstractmethod
+    async def remove_token(self, key) -> bool:
+        pass
+
+    @abstractmethod
+    async def replace_refresh_token(self, subject, old_token_id, new_token_id) -> bool:
+        """Removes the old refresh token and stores the new one as one step.
+
+        Returns False, leaving nothing stored, if the old token was not there.
+        """
+
+    @abstractmethod
+    async def remove_refresh_tokens(self, subject) -> None:
         pass
 
     @abstractmethod
-    def add_refresh_token(self, key, token) -> None:
+    async def revoke_token_pair(self, access_key, subject, refresh_token_id) -> None:
         pass
 
     @abstractmethod
-    def get_token(self, key) -> str:
+    async def is_token_pair_active(self, access_key, subject, refresh_token_id) -> bool:
         pass
 
     @abstractmethod
-    def remove_token(self, key) -> None:
+    async def get_revoked_access_keys(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    async def set_roles_updated_at(self, key, timestamp: float) -> None:
+        pass
+
+    @abstractmethod
+    async def get_roles_updated_at(self, key) -> float | None:
+        pass
+
+    @abstractmethod
+    async def set_logged_out_at(self, key, timestamp: float) -> None:
+        pass
+
+    @abstractmethod
+    async def get_logged_out_at(self, key) -> float | None:
         pass
 
 
 class RedisTokenStorageService(TokenStorageService):
+    """Keeps revoked access tokens and live refresh tokens in Redis.
+
+    Refresh tokens of a user live in one sorted set, ``refresh_tokens:{subject}``,
+    as their ``jti`` scored by expiry, so logging out everywhere is a single
+    DEL. The key-based methods (``get_token``, ``remove_token``) also serve
+    refresh tokens issued before the ``jti`` claim, stored under
+    ``{subject}_{token}`` until they expire.
+    """
+
     def __init__(self, redis: Redis):
         self.redis = redis
 
-    def add_access_token(self, key, token):
-        self.redis.set(key, token, ex=settings.access_token_expire_minutes * 60)
+    async def add_access_token(self, key):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._add_access_token(pipe, key)
+            await pipe.execute()
+
+    async def add_refresh_token(self, subject, token_id):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._add_refresh_token(pipe, subject, token_id)
+            await pipe.execute()
+
+    async def get_token(self, key) -> str:
+        return await self.redis.get(key)
+
+    async def get_tokens(self, *keys) -> list[str | None]:
+        return await self.redis.mget(keys)
+
+    async def remove_token(self, key) -> bool:
+        return bool(await self.redis.delete(key))
+
+    async def replace_refresh_token(self, subject, old_token_id, new_token_id) -> bool:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._get_refresh_tokens_key(subject), old_token_id)
+            self._add_refresh_token(pipe, subject, new_token_id)
+            removed, *_ = await pipe.execute()
+        if not removed:
+            # The old token had already been used or revoked: drop the new one.
+            await self.redis.zrem(self._get_refresh_tokens_key(subject), new_token_id)
+            return False
+        return True
+
+    async def remove_refresh_tokens(self, subject):
+        await self.redis.delete(self._get_refresh_tokens_key(subject))
+
+    async def revoke_token_pair(self, access_key, subject, refresh_token_id):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._add_access_token(pipe, access_key)
+            pipe.zrem(self._get_refresh_tokens_key(subject), refresh_token_id)
+            await pipe.execute()
+
+    async def is_token_pair_active(self, access_key, subject, refresh_token_id) -> bool:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(access_key)
+            pipe.zscore(self._get_refresh_tokens_key(subject), refresh_token_id)
+            revoked, expires_at = await pipe.execute()
+        return not revoked and expires_at is not None and expires_at > time()
+
+    async def get_revoked_access_keys(self) -> list[str]:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(REVOKED_ACCESS_KEYS, '-inf', time())
+            pipe.zrange(REVOKED_ACCESS_KEYS, 0, -1)
+            _, keys = await pipe.execute()
+        return [key.decode() for key in keys]
+
+    def _add_access_token(self, pipe, key):
+        expire_seconds = settings.access_token_expire_minutes * 60
+        pipe.set(key, 1, ex=expire_seconds)
+        pipe.zadd(REVOKED_ACCESS_KEYS, {key: time() + expire_seconds})
+        pipe.publish(REVOKED_ACCESS_KEYS_CHANNEL, key)
+
+    def _add_refresh_token(self, pipe, subject, token_id):
+        # The newest token outlives every other one in the set, so the set
+        # expires with it; expired members are pruned as new ones come in.
+        key = self._get_refresh_tokens_key(subject)
+        expire_seconds = settings.refresh_token_expire_minutes * 60
+        now = time()
+        pipe.zremrangebyscore(key, '-inf', now)
+        pipe.zadd(key, {token_id: now + expire_seconds})
+        pipe.expire(key, expire_seconds)
+
+    def _get_refresh_tokens_key(self, subject) -> str:
+        return f'refresh_tokens:{subject}'
+
+    async def set_roles_updated_at(self, key, timestamp: float):
+        # Access tokens minted before the mark are stale; once the longest-lived
+        # of them has expired the mark is no longer needed.
+        await self.redis.set(key, timestamp, ex=settings.access_token_expire_minutes * 60)
 
-    def add_refresh_token(self, key, token):
-        self.redis.set(key, token, ex=settings.refresh_token_expire_minutes * 60)
+    async def get_roles_updated_at(self, key) -> float | None:
+        timestamp = await self.redis.get(key)
+        return float(timestamp) if timestamp is not None else None
 
-    def get_token(self, key) -> str:
-        return self.redis.get(key)
+    async def set_logged_out_at(self, key, timestamp: float):
+        # Refresh tokens issued before the mark are revoked; it outlives them all.
+        await self.redis.set(key, timestamp, ex=settings.refresh_token_expire_minutes * 60)
 
-    def remove_token(self, key):
-        self.redis.delete(key)
+    async def get_logged_out_at(self, key) -> float | None:
+        timestamp = await self.redis.get(key)
+        return float(timestamp) if timestamp is not None else None
 
 
 def get_token_storage_service(
@@ -2,18 +2,24 @@ from typing import Annotated
 
 from fastapi import Depends
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.sqlalchemy import get_session, User
 from models.user import UserCreateRequest
+from services.password import PasswordService, PasswordServiceBusyError, get_password_service
 
 
 class UserService:
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, password_service: PasswordService):
         self.db_session = db_session
+        self.password_service = password_service
 
     async def create_user(self, request: UserCreateRequest):
-        new_user = User(**request.model_dump())
+        new_user = User(
+            **request.model_dump(exclude={'password'}),
+            pass_hash=await self.password_service.hash_password(request.password)
+        )
         self.db_session.add(new_user)
         await self.db_session.commit()
         return new_user
@@ -22,17 +28,36 @@ class UserService:
         query = select(User).filter_by(login=login)
         return await self.db_session.scalar(query)
 
-    async def check_password(self, user_id, password: str):
-        user = await self.get_by_id(user_id)
-        if not user:
+    async def get_with_roles_by_login(self, login: str):
+        query = (
+            select(User)
+            .options(joinedload(User.roles))
+            .filter_by(login=login)
+        )
+        return (await self.db_session.scalars(query)).unique().first()
+
+    async def check_password(self, user: User, password: str):
+        if not await self.password_service.check_password(user.pass_hash, password):
             return False
-        return user.check_password(password)
+        if self.password_service.needs_rehash(user.pass_hash):
+            try:
+                user.pass_hash = await self.password_service.hash_password(password)
+            except PasswordServiceBusyError:
+                # The rehash can wait for a later login; this one succeeded.
+                return True
+            await self.db_session.commit()
+        return True
 
     async def get_by_id(self, user_id):
-        query = select(User).filter_by(id=user_id)
-        return await self.db_session.scalar(query)
+        # Session.get consults the identity map first, so a user already
+        # loaded earlier in the request is not selected again.
+        return await self.db_session.get(User, user_id)
+
+    async def get_with_roles(self, user_id):
+        return await self.db_session.get(User, user_id, options=[joinedload(User.roles)])
 
 
 def get_user_service(
-        db_session: Annotated[AsyncSession, Depends(get_session)]):
-    return UserService(db_session)
+        db_session: Annotated[AsyncSession, Depends(get_session)],
+        password_service: Annotated[PasswordService, Depends(get_password_service)]):
+    return UserService(db_session, password_service)
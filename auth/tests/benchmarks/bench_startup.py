@@ -0,0 +1,54 @@
+"""Compares the two start-up modes of the auth lifespan.
+
+``upgrade`` runs ``alembic upgrade head`` under the advisory lock, as every
+worker used to do on start; ``verify`` only reads ``alembic_version``. The
+database is expected to be at head already, so both measure the steady
+state of a restart.
+
+Run from ``auth/src`` (where ``alembic.ini`` lives) against a migrated database:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_startup.py
+"""
+import time
+import asyncio
+import statistics
+
+from core.config import settings
+from db.engine import create_engine
+from db.migrations import upgrade_schema, verify_schema
+
+
+ROUNDS = 10
+
+
+async def measure_verify() -> list[float]:
+    timings = []
+    for _ in range(ROUNDS):
+        # A fresh engine per round, as a freshly started worker would have.
+        engine = create_engine(settings)
+        started = time.perf_counter()
+        await verify_schema(engine)
+        timings.append(time.perf_counter() - started)
+        await engine.dispose()
+    return timings
+
+
+def measure_upgrade() -> list[float]:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        upgrade_schema()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    print(
+        f'{name:<8} median {statistics.median(timings) * 1000:>8.1f} ms '
+        f'max {max(timings) * 1000:>8.1f} ms'
+    )
+
+
+if __name__ == '__main__':
+    report('upgrade', measure_upgrade())
+    report('verify', asyncio.run(measure_verify()))
@@ -0,0 +1,101 @@
+"""Compares the blocking and the asyncio token storage on a logout workload.
+
+Every simulated logout checks two keys and then writes two keys, which is
+exactly what /auth/logout/ does. The blocking variant reproduces the former
+implementation (sync ``redis.Redis`` called from coroutines); the asyncio
+variant goes through ``RedisTokenStorageService``.
+
+Run from ``auth/src`` against a disposable Redis:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_token_storage.py
+"""
+import time
+import asyncio
+from uuid import uuid4
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis, BlockingConnectionPool
+
+from core.config import settings
+from services.token_storage import RedisTokenStorageService
+
+
+LOGOUTS = 5000
+CONCURRENCY = 100
+TICK = 0.001
+
+
+class BlockingTokenStorage:
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def logout(self, access_key: str, refresh_key: str):
+        self.redis.get(access_key)
+        self.redis.get(refresh_key)
+        self.redis.set(access_key, 'token', ex=settings.access_token_expire_minutes * 60)
+        self.redis.delete(refresh_key)
+
+
+class AsyncTokenStorage:
+    def __init__(self, storage: RedisTokenStorageService):
+        self.storage = storage
+
+    async def logout(self, access_key: str, refresh_key: str):
+        await self.storage.is_token_pair_active(access_key, 'bench', refresh_key)
+        await self.storage.revoke_token_pair(access_key, 'bench', refresh_key)
+
+
+async def monitor_loop(stalls: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        stalls.append(max(time.perf_counter() - started - TICK, 0))
+
+
+async def run(storage) -> dict[str, float]:
+    keys = [(f'bench_{uuid4()}', f'bench_{uuid4()}') for _ in range(LOGOUTS)]
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def logout(access_key: str, refresh_key: str):
+        async with semaphore:
+            await storage.logout(access_key, refresh_key)
+
+    stalls, stop = [], asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop(stalls, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(logout(*pair) for pair in keys))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+    return {
+        'logouts_per_second': LOGOUTS / elapsed,
+        'max_stall_ms': max(stalls, default=0) * 1000,
+        'total_stall_ms': sum(stalls) * 1000,
+    }
+
+
+def report(name: str, result: dict[str, float]):
+    print(
+        f'{name:<10} {result["logouts_per_second"]:>10.0f} logouts/s '
+        f'{result["max_stall_ms"]:>10.2f} ms max stall '
+        f'{result["total_stall_ms"]:>10.2f} ms total stall'
+    )
+
+
+async def main():
+    sync_redis = Redis(host=settings.token_storage_host, port=settings.token_storage_port)
+    async_redis = AsyncRedis(connection_pool=BlockingConnectionPool(
+        host=settings.token_storage_host,
+        port=settings.token_storage_port,
+        max_connections=settings.token_storage_max_connections
+    ))
+    try:
+        report('blocking', await run(BlockingTokenStorage(sync_redis)))
+        report('asyncio', await run(AsyncTokenStorage(RedisTokenStorageService(async_redis))))
+    finally:
+        sync_redis.close()
+        await async_redis.close(close_connection_pool=True)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
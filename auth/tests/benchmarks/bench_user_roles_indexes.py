@@ -0,0 +1,105 @@
+"""Times the /role/belongs membership query with and without the user_roles indexes.
+
+A throwaway schema is seeded with 250 000 users, 20 roles and a million
+memberships; the query from ``RoleService.get_membership_by_title`` is timed
+before and after creating the indexes added by revision ``b601b9c66e7b``.
+The schema is dropped at the end.
+
+Run from ``auth/src`` against a scratch database:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_user_roles_indexes.py
+"""
+import time
+import random
+import asyncio
+import statistics
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from core.config import settings
+from db.engine import create_engine
+from services.role import RoleService, membership_cache
+
+
+SCHEMA = 'user_roles_bench'
+USERS = 250_000
+ROLES = 20
+MEMBERSHIPS = 1_000_000
+LOOKUPS = 500
+
+SEED = [
+    f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE',
+    f'CREATE SCHEMA {SCHEMA}',
+    f'SET search_path TO {SCHEMA}',
+    'CREATE TABLE roles (id serial PRIMARY KEY, title varchar NOT NULL UNIQUE)',
+    """CREATE TABLE users (
+        id serial PRIMARY KEY,
+        first_name varchar NOT NULL,
+        last_name varchar NOT NULL,
+        login varchar NOT NULL UNIQUE,
+        pass_hash varchar NOT NULL
+    )""",
+    """CREATE TABLE user_roles (
+        id serial PRIMARY KEY,
+        user_id integer NOT NULL REFERENCES users (id),
+        role_id integer NOT NULL REFERENCES roles (id)
+    )""",
+    f"INSERT INTO roles (title) SELECT 'role_' || i FROM generate_series(1, {ROLES}) AS i",
+    f"""INSERT INTO users (first_name, last_name, login, pass_hash)
+        SELECT 'bench', 'bench', 'bench_' || i, '' FROM generate_series(1, {USERS}) AS i""",
+    f"""INSERT INTO user_roles (user_id, role_id)
+        SELECT i % {USERS} + 1, i / {USERS} % {ROLES} + 1 FROM generate_series(0, {MEMBERSHIPS - 1}) AS i""",
+    'ANALYZE',
+]
+
+INDEXES = [
+    'CREATE UNIQUE INDEX ix_user_roles_user_id_role_id ON user_roles (user_id, role_id)',
+    'CREATE INDEX ix_user_roles_role_id ON user_roles (role_id)',
+    'ANALYZE user_roles',
+]
+
+
+async def execute_all(connection: AsyncConnection, statements: list[str]):
+    for statement in statements:
+        await connection.execute(text(statement))
+    await connection.commit()
+
+
+async def time_lookups(connection: AsyncConnection) -> list[float]:
+    role_service = RoleService(AsyncSession(bind=connection), token_service=None, redis=None)
+    membership_cache.clear()
+    rng = random.Random(0)
+    timings = []
+    for _ in range(LOOKUPS):
+        user_id, role_title = rng.randint(1, USERS), f'role_{rng.randint(1, ROLES)}'
+        started = time.perf_counter()
+        await role_service.get_membership_by_title(user_id, role_title)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    print(
+        f'{name:<16} median {statistics.median(timings) * 1000:>8.2f} ms '
+        f'p95 {statistics.quantiles(timings, n=20)[-1] * 1000:>8.2f} ms'
+    )
+
+
+async def main():
+    engine = create_engine(settings)
+    try:
+        async with engine.connect() as connection:
+            await execute_all(connection, SEED)
+            try:
+                report('without indexes', await time_lookups(connection))
+                await execute_all(connection, [f'SET search_path TO {SCHEMA}', *INDEXES])
+                report('with indexes', await time_lookups(connection))
+            finally:
+                await execute_all(connection, [f'DROP SCHEMA {SCHEMA} CASCADE'])
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -6,6 +6,8 @@ from http import HTTPStatus
 import pytest
 import asyncio
 import pytest_asyncio
+from jose import jwt
+from werkzeug.security import generate_password_hash
 from redis import Redis
 from aiohttp import ClientSession
 from sqlalchemy import delete, select
@@ -27,7 +29,11 @@ def event_loop():
 @pytest.fixture(scope='session')
 def users():
     with open(Path('/app') / 'testdata' / 'users.json') as raw_users:
-        yield [User(**user) for user in json.load(raw_users)]
+        test_users = []
+        for user in json.load(raw_users):
+            password = user.pop('password')
+            test_users.append(User(**user, pass_hash=generate_password_hash(password)))
+        yield test_users
 
 
 @pytest_asyncio.fixture(autouse=True, scope='session')
@@ -84,5 +90,6 @@ def redis():
 @pytest.fixture(scope='session')
 def token_exists(redis: Redis):
     def inner(subject: str, token: str):
-        return redis.exists(f'{subject}_{token}')
+        token_id = jwt.get_unverified_claims(token)['jti']
+        return redis.zscore(f'refresh_tokens:{subject}', token_id) is not None
     return inner
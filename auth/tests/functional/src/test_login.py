@@ -1,3 +1,5 @@
+import json
+import base64
 from http import HTTPStatus
 
 import pytest
@@ -27,3 +29,16 @@ async def test_login(post, credentials, expected_status):
     if status == HTTPStatus.OK:
         assert 'access_token' in body
         assert 'refresh_token' in body
+
+
+@pytest.mark.asyncio
+async def test_access_token_carries_role_claims(post):
+    # Act
+    status, body = await post(LOGIN_ROUTE, {'login': 'login1', 'password': 'pass1'})
+
+    # Assert
+    assert status == HTTPStatus.OK
+    payload = body['access_token'].split('.')[1]
+    claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    assert claims['roles'] == []
+    assert 'iat' in claims
@@ -1,6 +1,10 @@
+from time import time
 from http import HTTPStatus
 
 import pytest
+from jose import jwt
+
+from settings import test_settings
 
 
 LOGOUT_ROUTE = '/auth/logout/'
@@ -78,4 +82,101 @@ async def test_invalid_refresh_token_logout(post):
     )
 
     # Assert
-    assert status == HTTPStatus.UNAUTHORIZED
\ No newline at end of file
+    assert status == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_every_refresh_token(post, token_exists):
+    # Arrange
+    sessions = []
+    for _ in range(2):
+        status, tokens = await post(
+            '/auth/login/',
+            {'login': 'login1', 'password': 'pass1'}
+        )
+        assert status < HTTPStatus.BAD_REQUEST
+        sessions.append(tokens)
+    subject = jwt.get_unverified_claims(sessions[0]['access_token'])['sub']
+    assert all(token_exists(subject, tokens['refresh_token']) for tokens in sessions)
+
+    # Act
+    status, _ = await post(
+        '/auth/logout-all/',
+        body=None,
+        headers={'Authorization': 'Bearer ' + sessions[0]['access_token']}
+    )
+    refresh_status, _ = await post(
+        '/auth/refresh/',
+        body=None,
+        headers={'Authorization': 'Bearer ' + sessions[1]['refresh_token']}
+    )
+
+    # Assert
+    assert status == HTTPStatus.NO_CONTENT
+    assert not any(token_exists(subject, tokens['refresh_token']) for tokens in sessions)
+    assert refresh_status == HTTPStatus.UNAUTHORIZED
+
+
+def create_legacy_refresh_token(redis, subject: str, issued_at: float) -> str:
+    """A refresh token as issued before the jti claim, stored under its old key."""
+    expire_seconds = test_settings.refresh_token_expire_minutes * 60
+    token = jwt.encode(
+        {'exp': int(issued_at) + expire_seconds, 'sub': subject},
+        test_settings.jwt_secret_key,
+        test_settings.jwt_sign_algorithm
+    )
+    redis.set(f'{subject}_{token}', 1, ex=expire_seconds)
+    return token
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_legacy_refresh_tokens(post, redis):
+    # Arrange
+    status, tokens = await post(
+        '/auth/login/',
+        {'login': 'login2', 'password': 'pass1'}
+    )
+    assert status < HTTPStatus.BAD_REQUEST
+    subject = jwt.get_unverified_claims(tokens['access_token'])['sub']
+    # Issued a second earlier, so it predates the logout-all mark.
+    legacy_token = create_legacy_refresh_token(redis, subject, time() - 1)
+
+    # Act
+    status, _ = await post(
+        '/auth/logout-all/',
+        body=None,
+        headers={'Authorization': 'Bearer ' + tokens['access_token']}
+    )
+    refresh_status, _ = await post(
+        '/auth/refresh/',
+        body=None,
+        headers={'Authorization': 'Bearer ' + legacy_token}
+    )
+
+    # Assert
+    assert status == HTTPStatus.NO_CONTENT
+    assert refresh_status == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_legacy_refresh_token_is_rotated(post, redis, token_exists):
+    # Arrange
+    status, tokens = await post(
+        '/auth/login/',
+        {'login': 'login3', 'password': 'pass1'}
+    )
+    assert status < HTTPStatus.BAD_REQUEST
+    subject = jwt.get_unverified_claims(tokens['access_token'])['sub']
+    legacy_token = create_legacy_refresh_token(redis, subject, time())
+
+    # Act
+    status, new_tokens = await post(
+        '/auth/refresh/',
+        body=None,
+        headers={'Authorization': 'Bearer ' + legacy_token}
+    )
+
+    # Assert
+    assert status == HTTPStatus.OK
+    assert not redis.exists(f'{subject}_{legacy_token}')
+    assert token_exists(subject, new_tokens['refresh_token'])
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+
+REFRESH_ROUTE = '/auth/refresh/'
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_single_use(post):
+    # Arrange
+    status, tokens = await post(
+        '/auth/login/',
+        {'login': 'login1', 'password': 'pass1'}
+    )
+    assert status < HTTPStatus.BAD_REQUEST
+    headers = {'Authorization': 'Bearer ' + tokens['refresh_token']}
+
+    # Act
+    first_status, new_tokens = await post(REFRESH_ROUTE, body=None, headers=headers)
+    second_status, _ = await post(REFRESH_ROUTE, body=None, headers=headers)
+
+    # Assert
+    assert first_status == HTTPStatus.OK
+    assert 'access_token' in new_tokens
+    assert 'refresh_token' in new_tokens
+    assert second_status == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_rotation_in_the_same_second_issues_a_new_token(post):
+    # Arrange
+    status, tokens = await post(
+        '/auth/login/',
+        {'login': 'login1', 'password': 'pass1'}
+    )
+    assert status < HTTPStatus.BAD_REQUEST
+
+    # Act: rotate twice right after login, within the token's exp second.
+    first_status, first_tokens = await post(
+        REFRESH_ROUTE,
+        body=None,
+        headers={'Authorization': 'Bearer ' + tokens['refresh_token']}
+    )
+    second_status, second_tokens = await post(
+        REFRESH_ROUTE,
+        body=None,
+        headers={'Authorization': 'Bearer ' + first_tokens['refresh_token']}
+    )
+
+    # Assert
+    assert first_status == second_status == HTTPStatus.OK
+    assert len({tokens['refresh_token'], first_tokens['refresh_token'], second_tokens['refresh_token']}) == 3
@@ -0,0 +1,13 @@
+import os
+
+# Settings are read on import; unit tests talk to no real services.
+for name, value in {
+    'JWT_SECRET_KEY': 'secret',
+    'JWT_SIGN_ALGORITHM': 'HS256',
+    'DEFAULT_ADMIN_LOGIN': 'admin',
+    'DEFAULT_ADMIN_PASSWORD': 'admin',
+    'POSTGRES_USER': 'app',
+    'POSTGRES_PASSWORD': 'app',
+    'POSTGRES_DB': 'auth',
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,161 @@
+from http import HTTPStatus
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from api.v1 import auth
+from db.sqlalchemy import User
+from services.password import PasswordService, PasswordServiceBusyError
+from services.token import get_token_service
+from services.user import UserService, get_user_service
+
+METHOD = 'pbkdf2:sha256:1000'
+PASSWORD = 'password1'
+
+
+def make_password_service(max_pending: int = 4, method: str = METHOD, salt_length: int = 16) -> PasswordService:
+    return PasswordService(ThreadPoolExecutor(max_workers=1), max_pending, method, salt_length)
+
+
+class BusyHashingPasswordService(PasswordService):
+    """Verifies passwords but has no room left to hash them."""
+
+    async def hash_password(self, password: str) -> str:
+        raise PasswordServiceBusyError
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+def make_user(pass_hash: str) -> User:
+    return User(login='user1', first_name='First', last_name='Last', pass_hash=pass_hash)
+
+
+@pytest.mark.parametrize(
+    'pass_hash,expected',
+    [
+        (generate_password_hash(PASSWORD, METHOD, 16), False),
+        (generate_password_hash(PASSWORD, 'pbkdf2:sha256:2000', 16), True),
+        (generate_password_hash(PASSWORD, METHOD, 8), True),
+        ('plain', True),
+    ]
+)
+def test_needs_rehash(pass_hash, expected):
+    assert make_password_service().needs_rehash(pass_hash) is expected
+
+
+@pytest.mark.asyncio
+async def test_busy_service_rejects_work():
+    with pytest.raises(PasswordServiceBusyError):
+        await make_password_service(max_pending=0).hash_password(PASSWORD)
+
+
+@pytest.mark.asyncio
+async def test_check_password_rehashes_outdated_hash():
+    session = FakeSession()
+    user = make_user(generate_password_hash(PASSWORD, METHOD, 8))
+    service = UserService(session, make_password_service())
+
+    assert await service.check_password(user, PASSWORD)
+
+    assert not service.password_service.needs_rehash(user.pass_hash)
+    assert check_password_hash(user.pass_hash, PASSWORD)
+    assert session.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_check_password_skips_rehash_when_busy():
+    session = FakeSession()
+    pass_hash = generate_password_hash(PASSWORD, METHOD, 8)
+    user = make_user(pass_hash)
+    password_service = BusyHashingPasswordService(ThreadPoolExecutor(max_workers=1), 4, METHOD, 16)
+
+    assert await UserService(session, password_service).check_password(user, PASSWORD)
+
+    assert user.pass_hash == pass_hash
+    assert session.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_check_password_wrong_password():
+    session = FakeSession()
+    user = make_user(generate_password_hash(PASSWORD, METHOD, 8))
+
+    assert not await UserService(session, make_password_service()).check_password(user, 'password2')
+    assert session.commits == 0
+
+
+class FakeUserService:
+    def __init__(self, user: User | None = None, busy: bool = False):
+        self.user = user
+        self.busy = busy
+
+    async def get_by_login(self, login: str):
+        return self.user
+
+    async def get_with_roles_by_login(self, login: str):
+        return self.user
+
+    async def create_user(self, request):
+        raise PasswordServiceBusyError
+
+    async def check_password(self, user: User, password: str):
+        if self.busy:
+            raise PasswordServiceBusyError
+        return True
+
+
+class FakeTokenService:
+    def create_access_token(self, subject, roles):
+        return 'access'
+
+    async def create_refresh_token(self, subject):
+        return 'refresh'
+
+
+def make_client(user_service) -> TestClient:
+    app = FastAPI()
+    app.include_router(auth.router, prefix='/auth')
+    app.dependency_overrides[get_user_service] = lambda: user_service
+    app.dependency_overrides[get_token_service] = FakeTokenService
+    return TestClient(app)
+
+
+def test_register_when_busy():
+    response = make_client(FakeUserService()).post(
+        '/auth/register/',
+        json={'first_name': 'First', 'last_name': 'Last', 'login': 'user1', 'password': PASSWORD}
+    )
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def test_login_when_verification_busy():
+    response = make_client(FakeUserService(make_user('hash'), busy=True)).post(
+        '/auth/login/',
+        json={'login': 'user1', 'password': PASSWORD}
+    )
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def test_login_when_only_rehash_busy():
+    user = make_user(generate_password_hash(PASSWORD, METHOD, 8))
+    user.id = 1
+    password_service = BusyHashingPasswordService(ThreadPoolExecutor(max_workers=1), 4, METHOD, 16)
+    user_service = UserService(FakeSession(), password_service)
+
+    async def get_with_roles_by_login(login: str):
+        return user
+
+    user_service.get_with_roles_by_login = get_with_roles_by_login
+    response = make_client(user_service).post('/auth/login/', json={'login': 'user1', 'password': PASSWORD})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'access_token': 'access', 'refresh_token': 'refresh'}
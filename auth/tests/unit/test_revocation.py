@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from core.bloom import BloomFilter
+from services import revocation
+from services.revocation import RevocationFilter, maintain_revocation_filter
+from services.token_storage import REVOKED_ACCESS_KEYS_CHANNEL
+
+KEYS = [f'access-key-{i}' for i in range(1000)]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(len(KEYS), 0.01)
+    for key in KEYS:
+        bloom.add(key)
+
+    assert all(key in bloom for key in KEYS)
+    assert bloom.count == len(KEYS)
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(len(KEYS), 0.01)
+    for key in KEYS:
+        bloom.add(key)
+
+    false_positives = sum(f'other-key-{i}' in bloom for i in range(10_000))
+    assert false_positives / 10_000 < 0.03
+    assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.5)
+
+
+def test_filter_not_ready_reports_every_key():
+    revocation_filter = RevocationFilter(100, 0.001)
+
+    assert revocation_filter.might_be_revoked('never-revoked')
+    assert revocation_filter.get_stats()['checks'] == 0
+
+
+def test_filter_rebuild():
+    revocation_filter = RevocationFilter(100, 0.001)
+    revocation_filter.add('expired')
+
+    revocation_filter.rebuild(KEYS)
+
+    assert revocation_filter.ready
+    assert all(revocation_filter.might_be_revoked(key) for key in KEYS)
+    assert not revocation_filter.might_be_revoked('expired')
+    assert not revocation_filter.might_be_revoked('never-revoked')
+    # Grown past the configured capacity, the filter keeps its error rate.
+    assert revocation_filter.get_stats()['estimated_false_positive_rate'] < 0.001
+
+
+def test_filter_add_after_rebuild():
+    revocation_filter = RevocationFilter(100, 0.001)
+    revocation_filter.rebuild([])
+
+    revocation_filter.add('revoked')
+
+    assert revocation_filter.might_be_revoked('revoked')
+
+
+async def wait_until(condition, timeout: float = 3):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_filter_recovers_from_a_bad_message(monkeypatch):
+    # Arrange
+    redis = FakeAsyncRedis()
+    revocation_filter = RevocationFilter(100, 0.001)
+    monkeypatch.setattr(revocation, 'revocation_filter', revocation_filter)
+    maintainer = asyncio.create_task(maintain_revocation_filter(redis))
+    try:
+        await wait_until(lambda: revocation_filter.ready)
+
+        # Act
+        await redis.publish(REVOKED_ACCESS_KEYS_CHANNEL, b'\xff')
+
+        # Assert: keys go to Redis until the filter is rebuilt and fed again.
+        await wait_until(lambda: not revocation_filter.ready)
+        assert revocation_filter.might_be_revoked('never-revoked')
+        await wait_until(lambda: revocation_filter.ready)
+        await redis.publish(REVOKED_ACCESS_KEYS_CHANNEL, 'revoked-later')
+        await wait_until(lambda: revocation_filter.might_be_revoked('revoked-later'))
+    finally:
+        maintainer.cancel()
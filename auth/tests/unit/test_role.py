@@ -0,0 +1,128 @@
+import asyncio
+from time import time
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from redis.exceptions import RedisError
+
+from services.role import RoleService, membership_cache
+from services.token import TokenService
+from services.token_storage import RedisTokenStorageService
+
+
+class FakeSession:
+    def __init__(self, on_commit=None):
+        self.added = []
+        self.commits = 0
+        self.on_commit = on_commit
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    async def execute(self, statement):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+        if self.on_commit:
+            self.on_commit()
+
+
+def make_role_service(session: FakeSession, server: FakeServer) -> tuple[RoleService, TokenService]:
+    redis = FakeAsyncRedis(server=server)
+    token_service = TokenService(RedisTokenStorageService(redis))
+    return RoleService(session, token_service, redis), token_service
+
+
+def make_unavailable_server() -> FakeServer:
+    server = FakeServer()
+    server.connected = False
+    return server
+
+
+@pytest.fixture(autouse=True)
+def cached_memberships():
+    membership_cache.set((1, 'admin'), 'member')
+    membership_cache.set((2, 'admin'), 'member')
+    yield
+    membership_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_grant_role_marks_role_claims_stale():
+    session = FakeSession()
+    service, token_service = make_role_service(session, FakeServer())
+    payload = {'sub': '1', 'iat': time() - 1}
+
+    user_role = await service.grant_role(1, 10)
+
+    assert session.added == [user_role]
+    assert session.commits == 1
+    assert await token_service.are_role_claims_stale(payload)
+    assert membership_cache.get((1, 'admin')) is None
+    assert membership_cache.get((2, 'admin')) == 'member'
+
+
+@pytest.mark.asyncio
+async def test_grant_role_is_not_applied_without_redis():
+    session = FakeSession()
+    service, _ = make_role_service(session, make_unavailable_server())
+
+    with pytest.raises(RedisError):
+        await service.grant_role(1, 10)
+
+    assert session.commits == 0
+    assert membership_cache.get((1, 'admin')) == 'member'
+
+
+@pytest.mark.asyncio
+async def test_revoke_role_is_not_applied_without_redis():
+    session = FakeSession()
+    service, _ = make_role_service(session, make_unavailable_server())
+
+    with pytest.raises(RedisError):
+        await service.revoke_role(1, 10)
+
+    assert session.commits == 0
+
+
+@pytest.mark.asyncio
+async def test_committed_grant_survives_redis_outage():
+    # Redis goes away once the change is committed.
+    server = FakeServer()
+    session = FakeSession(on_commit=lambda: setattr(server, 'connected', False))
+    service, _ = make_role_service(session, server)
+
+    await service.grant_role(1, 10)
+
+    assert session.commits == 1
+    assert membership_cache.get((1, 'admin')) is None
+
+
+@pytest.mark.asyncio
+async def test_committed_revoke_survives_redis_outage():
+    server = FakeServer()
+    session = FakeSession(on_commit=lambda: setattr(server, 'connected', False))
+    service, _ = make_role_service(session, server)
+
+    await service.revoke_role(1, 10)
+
+    assert session.commits == 1
+    assert membership_cache.get((1, 'admin')) is None
+
+
+@pytest.mark.asyncio
+async def test_role_change_is_published():
+    server = FakeServer()
+    service, _ = make_role_service(FakeSession(), server)
+    async with FakeAsyncRedis(server=server).pubsub() as pubsub:
+        await pubsub.subscribe('role-changes')
+        await service.grant_role(2, 10)
+
+        message = None
+        async with asyncio.timeout(1):
+            while message is None:
+                # The subscribe confirmation is skipped as a None.
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+
+    assert message['data'] == b'2'
@@ -0,0 +1,54 @@
+from time import time
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from core.config import settings
+from services.token import TokenService
+from services.token_storage import RedisTokenStorageService
+
+SUBJECT = '1'
+
+
+@pytest.fixture
+def token_service() -> TokenService:
+    return TokenService(RedisTokenStorageService(FakeAsyncRedis()))
+
+
+async def create_legacy_refresh_token(token_service: TokenService, issued_at: float) -> tuple[dict, str]:
+    """A refresh token as issued before the jti claim, stored under its old key."""
+    payload = {'exp': int(issued_at) + settings.refresh_token_expire_minutes * 60, 'sub': SUBJECT}
+    token = f'legacy-{issued_at}'
+    await token_service.token_storage_service.redis.set(f'{SUBJECT}_{token}', 1)
+    return payload, token
+
+
+async def logout_all(token_service: TokenService) -> None:
+    access_token = token_service.create_access_token(SUBJECT, [])
+    await token_service.revoke_all_tokens(token_service.get_payload(access_token), access_token)
+
+
+@pytest.mark.asyncio
+async def test_legacy_refresh_token_is_rotated(token_service):
+    payload, token = await create_legacy_refresh_token(token_service, time())
+
+    assert await token_service.rotate_refresh_token(payload, token)
+    assert not await token_service.rotate_refresh_token(payload, token)
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_legacy_refresh_tokens(token_service):
+    payload, token = await create_legacy_refresh_token(token_service, time() - 1)
+
+    await logout_all(token_service)
+
+    assert not await token_service.rotate_refresh_token(payload, token)
+
+
+@pytest.mark.asyncio
+async def test_logout_all_revokes_refresh_tokens(token_service):
+    refresh_token = await token_service.create_refresh_token(SUBJECT)
+
+    await logout_all(token_service)
+
+    assert not await token_service.rotate_refresh_token(token_service.get_payload(refresh_token), refresh_token)
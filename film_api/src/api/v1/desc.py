@@ -2,16 +2,20 @@ desc = {
     'films': {
         'search_films': 'Conducts a full-text search of films by their title and description',
         'get_film_details': 'Fetches a film by its id',
-        'get_film_list': 'Extracts a list of films. Optionally, films can be sorted by rating or name. Furthermore, films can be filtered by a genre'
+        'get_film_list': 'Extracts a list of films. Optionally, films can be sorted by rating or name. Furthermore, films can be filtered by a genre. Given `ids`, fetches those films with their details instead, in the order requested. With `Accept: application/x-ndjson` the films are streamed, one JSON document per line'
     },
     'genres': {
         'get_genre_by_id': 'Fetches a genre by its id',
-        'get_genres': 'Extracts a list of genres'
+        'get_genres': 'Extracts a list of genres. Given `ids`, fetches those genres instead, in the order requested'
     },
     'persons': {
         'search_persons': 'Conducts a full-text search of people by their full names',
-        'get_person_films': 'Gets films of the person specified by their id',
-        'get_person_by_id': 'Fetches a person by their id'
+        'get_person_films': 'Gets films of the person specified by their id. With `Accept: application/x-ndjson` the films are streamed, one JSON document per line',
+        'get_person_by_id': 'Fetches a person by their id',
+        'get_persons_by_ids': 'Fetches the people with the `ids` given, in the order requested'
+    },
+    'metrics': {
+        'get_metrics': 'Reports hit ratios and memory use of the in-process and the Redis cache tiers'
     }
 }
 
@@ -1,10 +1,11 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 
 from .desc import desc
-from .models import FilmListRequest
+from .models import BatchIds, FilmListRequest
+from .responses import json_response, ndjson_response, wants_ndjson
 from models.film import FilmInfo, FilmItem
 from models.common import ListRequest, SearchRequest
 from services.film import FilmService, get_film_service
@@ -16,35 +17,42 @@ router = APIRouter()
 async def search_films(
         request: Annotated[SearchRequest, Query()],
         film_service: Annotated[FilmService, Depends(get_film_service)]
-) -> list[FilmItem]:
+) -> Response:
     films = await film_service.search_films(request)
-    return [FilmItem(**film.model_dump()) for film in films] if films else []
+    return json_response(films or [], list[FilmItem])
 
 
 @router.get('/{film_id}', response_model=FilmInfo, description=desc['films']['get_film_details'])
 async def get_film_details(
         film_id: str,
         film_service: Annotated[FilmService, Depends(get_film_service)]
-) -> FilmInfo:
+) -> Response:
     film = await film_service.get_film_by_id(film_id)
     if not film:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='film not found'
         )
-    return FilmInfo(**film.model_dump())
+    return json_response(film, FilmInfo)
 
 
-@router.get('/', response_model=list[FilmItem], description=desc['films']['get_film_list'])
+@router.get('/', response_model=list[FilmItem] | list[FilmInfo], description=desc['films']['get_film_list'])
 async def get_film_list(
         request: Annotated[FilmListRequest, Query()],
-        film_service: Annotated[FilmService, Depends(get_film_service)]
-) -> list[FilmItem]:
+        film_service: Annotated[FilmService, Depends(get_film_service)],
+        accept: Annotated[str | None, Header()] = None,
+        ids: BatchIds = None
+) -> Response:
+    if ids:
+        films = await film_service.get_films_by_ids(ids)
+        return json_response(films or [], list[FilmInfo])
     request = ListRequest(**request.model_dump(), query=request.genre)
     if request.sort and not film_service.validate_request(request):
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='invalid sort parameter'
         )
+    if wants_ndjson(accept):
+        return ndjson_response(film_service.iter_film_list_pages(request))
     films = await film_service.get_film_list(request)
-    return [FilmItem(**film.model_dump()) for film in films] if films else []
+    return json_response(films or [], list[FilmItem])
@@ -1,9 +1,11 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from .desc import desc
+from .models import BatchIds
+from .responses import json_response
 from models.genre import Genre
 from models.common import ListRequest
 from services.genre import GenreService, get_genre_service
@@ -15,25 +17,29 @@ router = APIRouter()
 async def get_genre_by_id(
     genre_id: str,
     genre_service: Annotated[GenreService, Depends(get_genre_service)]
-) -> Genre:
+) -> Response:
     genre = await genre_service.get_genre_by_id(genre_id)
     if not genre:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='genre not found'
         )
-    return Genre(**genre.model_dump())
+    return json_response(genre, Genre)
 
 
 @router.get('/', response_model=list[Genre], description=desc['genres']['get_genres'])
 async def get_genres(
     request: Annotated[ListRequest, Query()],
-    genre_service: Annotated[GenreService, Depends(get_genre_service)]
-) -> list[Genre]:
+    genre_service: Annotated[GenreService, Depends(get_genre_service)],
+    ids: BatchIds = None
+) -> Response:
+    if ids:
+        genres = await genre_service.get_genres_by_ids(ids)
+        return json_response(genres or [], list[Genre])
     if request.sort and not genre_service.validate_request(request):
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='invalid sort parameter'
         )
     genres = await genre_service.get_genres(request)
-    return [Genre(**genre.model_dump()) for genre in genres] if genres else []
\ No newline at end of file
+    return json_response(genres or [], list[Genre])
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
+
+from .desc import desc
+from db.redis import get_redis
+from services.redis import local_cache, redis_tier_stats
+
+router = APIRouter()
+
+
+@router.get('/', description=desc['metrics']['get_metrics'])
+async def get_metrics(
+        redis: Annotated[Redis, Depends(get_redis)]
+) -> dict[str, dict[str, float]]:
+    memory = await redis.info('memory')
+    return {
+        'local_cache': local_cache.get_stats(),
+        'redis_cache': {**redis_tier_stats.get_stats(), 'size_bytes': memory['used_memory']},
+    }
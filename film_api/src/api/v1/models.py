@@ -1,3 +1,6 @@
+from typing import Annotated
+
+from fastapi import Query
 from pydantic import BaseModel, Field
 
 
@@ -31,3 +34,7 @@ class FilmListRequest(BaseModel):
     page_size: int | None = Field(None, gt=0)
     sort: str | None = Field(None, pattern=r'^[-+][a-zA-Z_]+$')
     genre: str | None = None
+
+
+# Ids of the documents to fetch at once, e.g. ?ids=...&ids=...
+BatchIds = Annotated[list[str] | None, Query(max_length=100)]
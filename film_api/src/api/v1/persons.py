@@ -1,9 +1,11 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 
 from .desc import desc
+from .models import BatchIds
+from .responses import json_response, ndjson_response, wants_ndjson
 from models.film import FilmItem
 from models.person import PersonInfo
 from models.common import SearchRequest
@@ -16,36 +18,41 @@ router = APIRouter()
 async def search_persons(
         request: Annotated[SearchRequest, Query()],
         person_service: Annotated[PersonService, Depends(get_person_service)]
-) -> list[PersonInfo]:
+) -> Response:
     people = await person_service.search_persons(request)
-    if not people:
-        return []
-    people_roles = []
-    for person in people:
-        roles = await person_service.get_person_film_roles(person.id)
-        people_roles.append(PersonInfo(**person.model_dump(), films=(roles if roles else [])))
-    return people_roles
+    return json_response(people or [], list[PersonInfo])
+
+
+@router.get('/', response_model=list[PersonInfo], description=desc['persons']['get_persons_by_ids'])
+async def get_persons_by_ids(
+        ids: BatchIds,
+        person_service: Annotated[PersonService, Depends(get_person_service)]
+) -> Response:
+    people = await person_service.get_persons_by_ids(ids)
+    return json_response(people or [], list[PersonInfo])
 
 
 @router.get('/{person_id}/film', response_model=list[FilmItem], description=desc['persons']['get_person_films'])
 async def get_person_films(
         person_id: str,
-        person_service: Annotated[PersonService, Depends(get_person_service)]
-) -> list[FilmItem]:
+        person_service: Annotated[PersonService, Depends(get_person_service)],
+        accept: Annotated[str | None, Header()] = None
+) -> Response:
+    if wants_ndjson(accept):
+        return ndjson_response(person_service.iter_person_film_pages(person_id))
     films = await person_service.get_person_films(person_id)
-    return [FilmItem(**film.model_dump()) for film in films] if films else []
+    return json_response(films or [], list[FilmItem])
 
 
 @router.get('/{person_id}', response_model=PersonInfo, description=desc['persons']['get_person_by_id'])
 async def get_person_by_id(
         person_id: str,
         person_service: Annotated[PersonService, Depends(get_person_service)]
-) -> PersonInfo:
+) -> Response:
     person = await person_service.get_person_by_id(person_id)
     if not person:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='no person found by id provided'
         )
-    person_roles = await person_service.get_person_film_roles(person_id)
-    return PersonInfo(**person.model_dump(), films=(person_roles if person_roles else []))
+    return json_response(person, PersonInfo)
@@ -0,0 +1,34 @@
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+from pydantic import BaseModel, TypeAdapter
+from fastapi.responses import Response, StreamingResponse
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+@lru_cache()
+def get_adapter(content_type: Any) -> TypeAdapter:
+    return TypeAdapter(content_type)
+
+
+def json_response(content: Any, content_type: Any) -> Response:
+    """Serializes already validated models as ``content_type`` in one pass.
+
+    Returning a Response skips FastAPI's validation against ``response_model``,
+    which stays on the route for the OpenAPI schema. Subclass instances, e.g.
+    FilmInfo for FilmItem, are written with the fields of ``content_type`` only.
+    """
+    return Response(get_adapter(content_type).dump_json(content), media_type='application/json')
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    return accept is not None and NDJSON_MEDIA_TYPE in accept
+
+
+def ndjson_response(pages: AsyncIterator[list[BaseModel]]) -> StreamingResponse:
+    """Streams items one JSON document per line, a page at a time as the pages arrive."""
+    async def lines():
+        async for page in pages:
+            yield b''.join(item.model_dump_json().encode() + b'\n' for item in page)
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
@@ -11,7 +11,18 @@ class Settings(BaseSettings):
     elastic_port: int = Field(9200, alias='ELASTIC_PORT')
     elastic_scheme: str = Field('http', alias='ELASTIC_SCHEME')
     default_cache_expiry_in_seconds: int = Field(30, alias='CACHE_EXPIRY_IN_SECONDS')
-    es_load_batch_size: int = Field(20, alias='ES_LOAD_BATCH_SIZE')
+    cache_negative_expiry_in_seconds: int = Field(5, alias='CACHE_NEGATIVE_EXPIRY_IN_SECONDS')
+    cache_stale_expiry_in_seconds: int = Field(300, alias='CACHE_STALE_EXPIRY_IN_SECONDS')
+    cache_early_refresh_beta: float = Field(1.0, alias='CACHE_EARLY_REFRESH_BETA')
+    cache_generation_check_seconds: float = Field(1.0, alias='CACHE_GENERATION_CHECK_SECONDS')
+    cache_compress_min_bytes: int = Field(16 * 1024, alias='CACHE_COMPRESS_MIN_BYTES')
+    local_cache_size: int = Field(1000, alias='LOCAL_CACHE_SIZE')
+    local_cache_max_bytes: int = Field(64 * 1024 * 1024, alias='LOCAL_CACHE_MAX_BYTES')
+    local_cache_expiry_in_seconds: int = Field(5, alias='LOCAL_CACHE_EXPIRY_IN_SECONDS')
+    cache_lock_timeout_ms: int = Field(5000, alias='CACHE_LOCK_TIMEOUT_MS')
+    cache_lock_poll_interval_ms: int = Field(20, alias='CACHE_LOCK_POLL_INTERVAL_MS')
+    es_load_batch_size: int = Field(1000, alias='ES_LOAD_BATCH_SIZE')
+    es_point_in_time_keep_alive: str = Field('1m', alias='ES_POINT_IN_TIME_KEEP_ALIVE')
 
 
 settings = Settings()
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from elasticsearch import AsyncElasticsearch
@@ -8,9 +9,12 @@ from api.v1 import films
 from api.v1 import genres
 from api.v1 import persons
 from api.v1 import desc
+from api.v1 import metrics
 from core.config import settings
 from db import elastic
 from db import redis
+from services.redis import listen_for_cache_invalidation
+from services.index_changes import listen_for_index_changes
 
 
 @asynccontextmanager
@@ -18,7 +22,14 @@ async def lifespan(app: FastAPI):
     redis.redis = Redis(host=settings.redis_host, port=settings.redis_port)
     elastic.es = AsyncElasticsearch(
         hosts=[f'{settings.elastic_scheme}://{settings.elastic_host}:{settings.elastic_port}'])
+    background_tasks = [
+        asyncio.create_task(listen_for_cache_invalidation(redis.redis)),
+        asyncio.create_task(listen_for_index_changes(redis.redis)),
+    ]
     yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
     await redis.redis.close()
     await elastic.es.close()
 
@@ -34,3 +45,4 @@ app = FastAPI(
 app.include_router(films.router, prefix='/api/v1/films', tags=['films'])
 app.include_router(genres.router, prefix='/api/v1/genres', tags=['genres'])
 app.include_router(persons.router, prefix='/api/v1/persons', tags=['persons'])
+app.include_router(metrics.router, prefix='/api/v1/metrics', tags=['metrics'])
@@ -12,10 +12,7 @@ class CastMember(BaseModel):
     name: str
 
 
-class FilmInfo(BaseModel):
-    id: str
-    title: str
-    imdb_rating: float | None
+class FilmInfo(FilmItem):
     description: str | None
     genres: list[str]
     actors: list[CastMember]
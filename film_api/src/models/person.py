@@ -11,7 +11,5 @@ class PersonFilm(BaseModel):
     roles: list[str]
 
 
-class PersonInfo(BaseModel):
-    id: str
-    full_name: str
+class PersonInfo(Person):
     films: list[PersonFilm]
@@ -0,0 +1,84 @@
+import json
+import time
+import hashlib
+from typing import Any, NamedTuple
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+from .codecs import ValueType
+
+
+class CacheNamespace(NamedTuple):
+    """A cached service method: what its keys start with and how its values are read."""
+    name: str
+    # Elasticsearch index the values come from; bumping its generation
+    # invalidates every key of the namespace at once.
+    index: str
+    value_type: ValueType
+    local: bool
+    # Kind of document id the method takes as its only argument, if any.
+    # Such keys hold the id itself and skip the generation, since the ETL
+    # reports changed ids and they are evicted one by one.
+    id_of: str | None = None
+
+
+def get_generation_key(project: str, index: str) -> str:
+    return f'{project}:generation:{index}'
+
+
+def get_cache_key(project: str, namespace: CacheNamespace, generation: int, args, kwargs) -> str:
+    """``{project}:{namespace}:g{generation}:{sha1 of the normalized arguments}``,
+    or ``{project}:{namespace}:{id}`` for namespaces keyed by a document id."""
+    if namespace.id_of:
+        doc_id, = (*args, *kwargs.values())
+        return get_id_cache_key(project, namespace, doc_id)
+    arguments = json.dumps(
+        [_normalize(args), _normalize(kwargs)],
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False
+    )
+    digest = hashlib.sha1(arguments.encode()).hexdigest()
+    return f'{project}:{namespace.name}:g{generation}:{digest}'
+
+
+def get_id_cache_key(project: str, namespace: CacheNamespace, doc_id: str) -> str:
+    return f'{project}:{namespace.name}:{doc_id}'
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+class Generations:
+    """Per-index generation counters, read from Redis at most every ``ttl`` seconds.
+
+    A missing counter is generation 0 and is never written here; the ETL
+    creates it with INCR when it first invalidates an index.
+    """
+
+    def __init__(self, project: str, ttl: float):
+        self.project = project
+        self.ttl = ttl
+        self._generations: dict[str, tuple[float, int]] = {}
+
+    async def get(self, redis: Redis, index: str) -> int:
+        checked_at, generation = self._generations.get(index, (float('-inf'), 0))
+        if time.monotonic() - checked_at < self.ttl:
+            return generation
+        stored_generation = await redis.get(get_generation_key(self.project, index))
+        return self.set(index, int(stored_generation) if stored_generation else 0)
+
+    def set(self, index: str, generation: int) -> int:
+        self._generations[index] = (time.monotonic(), generation)
+        return generation
+
+    def invalidate(self, index: str) -> None:
+        self._generations.pop(index, None)
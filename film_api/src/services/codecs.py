@@ -0,0 +1,81 @@
+import json
+import zlib
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, NamedTuple
+
+from pydantic import TypeAdapter, ValidationError
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    # Past this moment the value is stale: still served, but refreshed.
+    fresh_until: float
+    # How long the value took to fetch, which scales early refreshes.
+    fetch_seconds: float
+
+
+class ValueType:
+    """Type of a cached value, with a fingerprint of its schema.
+
+    Entries written for another schema, e.g. before a model changed, do not
+    match the fingerprint and are read as misses.
+    """
+
+    def __init__(self, annotation: Any):
+        self.adapter = TypeAdapter(annotation)
+        schema = json.dumps(self.adapter.json_schema(), sort_keys=True)
+        self.fingerprint = zlib.crc32(schema.encode())
+
+
+class CacheCodec(ABC):
+    @abstractmethod
+    def encode(self, entry: CacheEntry, value_type: ValueType) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes, value_type: ValueType) -> CacheEntry | None:
+        """Returns None for data this codec cannot read back as ``value_type``."""
+
+
+class JsonCodec(CacheCodec):
+    """JSON of the dumped value behind a fixed header, compressed past ``compress_min_bytes``.
+
+    Header: format version, flags, schema fingerprint, fresh_until, fetch_seconds.
+    """
+
+    VERSION = 1
+    COMPRESSED = 0x01
+    HEADER = struct.Struct('>BBIdd')
+
+    def __init__(self, compress_min_bytes: int, compress_level: int = 1):
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+
+    def encode(self, entry: CacheEntry, value_type: ValueType) -> bytes:
+        payload, flags = value_type.adapter.dump_json(entry.value), 0
+        if len(payload) >= self.compress_min_bytes:
+            payload, flags = zlib.compress(payload, self.compress_level), self.COMPRESSED
+        header = self.HEADER.pack(
+            self.VERSION,
+            flags,
+            value_type.fingerprint,
+            entry.fresh_until,
+            entry.fetch_seconds
+        )
+        return header + payload
+
+    def decode(self, data: bytes, value_type: ValueType) -> CacheEntry | None:
+        if len(data) < self.HEADER.size:
+            return None
+        version, flags, fingerprint, fresh_until, fetch_seconds = self.HEADER.unpack_from(data)
+        if version != self.VERSION or fingerprint != value_type.fingerprint:
+            return None
+        payload = data[self.HEADER.size:]
+        try:
+            if flags & self.COMPRESSED:
+                payload = zlib.decompress(payload)
+            value = value_type.adapter.validate_json(payload)
+        except (zlib.error, ValidationError):
+            return None
+        return CacheEntry(value, fresh_until, fetch_seconds)
@@ -1,82 +1,187 @@
-from typing import Any, Annotated
+from functools import lru_cache
+from typing import Any, Annotated, AsyncIterator
 
 from fastapi import Depends
+from pydantic import BaseModel
 from elasticsearch import AsyncElasticsearch, NotFoundError
 
 from core.config import settings
 from db.elastic import get_elastic
 from models.common import ListRequest, SearchRequest
+from .queries import get_exact_query, get_nested_query, get_search_query, with_source
+
+
+@lru_cache()
+def get_source_fields(model: type[BaseModel]) -> list[str]:
+    """``_source`` includes with just the fields ``model`` is built from."""
+    return [field.alias or name for name, field in model.model_fields.items()]
 
 
 class ElasticService:
+    """Document lookups; ``source``, if given, limits the returned ``_source`` to those fields."""
+
     def __init__(self, elastic: AsyncElasticsearch):
         self.elastic = elastic
 
-    async def get_doc_by_id(self, index: str, doc_id: str) -> dict[str, Any] | None:
+    async def get_doc_by_id(
+            self,
+            index: str,
+            doc_id: str,
+            source: list[str] | None = None
+    ) -> dict[str, Any] | None:
         try:
-            doc = await self.elastic.get(index=index, id=doc_id)
+            doc = await self.elastic.get(index=index, id=doc_id, source_includes=source)
         except NotFoundError:
             return None
         return doc['_source']
 
-    async def search_docs(self, index: str, request: SearchRequest, fields: list[str]) -> list[dict[str, Any]] | None:
+    async def get_docs_by_ids(
+            self,
+            index: str,
+            doc_ids: list[str],
+            source: list[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """The found documents among ``doc_ids`` by id, fetched with a single mget."""
+        if not doc_ids:
+            return {}
+        try:
+            docs = await self.elastic.mget(index=index, ids=doc_ids, source_includes=source)
+        except NotFoundError:
+            return {}
+        return {doc['_id']: doc['_source'] for doc in docs['docs'] if doc.get('found')}
+
+    async def search_docs(
+            self,
+            index: str,
+            request: SearchRequest,
+            fields: list[str],
+            source: list[str] | None = None
+    ) -> list[dict[str, Any]] | None:
         if not fields:
             return None
         try:
-            docs = await self.elastic.search(index=index, body={
-                'from': request.page_number * request.page_size,
-                'size': request.page_size,
-                'query': {'bool': {'should': [{'match': {field: request.query}} for field in fields]}}
-            })
+            docs = await self.elastic.search(index=index, body=with_source(get_search_query(request, fields), source))
         except NotFoundError:
             return None
         return [doc['_source'] for doc in docs['hits']['hits']]
 
-    async def get_exact_docs(self, index: str, request: ListRequest, fields: list[str] = []) -> list[dict[
-        str, Any]] | None:
-        body = {'query': {'match_all': {}}}
-        if request.query and fields:
-            body['query'] = {'bool': {'should': [{'term': {field: request.query}} for field in fields]}}
-        if (request.page_number is not None) and (request.page_size is not None):
-            body['size'], body['from'] = request.page_size, request.page_number * request.page_size
-        if request.sort:
-            body['sort'] = [{request.sort[1:]: 'desc' if request.sort[0] == '-' else 'asc'}]
-        docs = await self._fetch_documents(index, body)
+    async def get_exact_docs(
+            self,
+            index: str,
+            request: ListRequest,
+            fields: list[str] = [],
+            source: list[str] | None = None
+    ) -> list[dict[str, Any]] | None:
+        docs = await self._fetch_documents(index, with_source(get_exact_query(request, fields), source))
         return [doc['_source'] for doc in docs] if docs else None
 
-    async def get_exact_docs_by_nested(self, index: str, query: str, fields: list[str]) -> list[dict[str, Any]] | None:
+    async def get_exact_docs_by_nested(
+            self,
+            index: str,
+            query: str,
+            fields: list[str],
+            source: list[str] | None = None
+    ) -> list[dict[str, Any]] | None:
         if not fields:
             return None
-        nested_queries = []
-        for field in fields:
-            arr, _ = field.split('.')
-            nested_queries.append({'nested': {'path': arr, 'query': {'bool': {'must': {'match': {field: query}}}}}})
-        docs = await self._fetch_documents(index, {'query': {'bool': {'should': nested_queries}}})
+        docs = await self._fetch_documents(index, with_source(get_nested_query([query], fields), source))
         return [doc['_source'] for doc in docs] if docs else None
 
-    async def _fetch_documents(self, index: str, query: dict[str, Any]) -> list[dict[str, Any]] | None:
+    async def get_exact_docs_by_nested_terms(
+            self,
+            index: str,
+            values: list[str],
+            fields: list[str],
+            source: list[str] | None = None
+    ) -> list[dict[str, Any]] | None:
+        """Documents with any of ``values`` in any of the nested ``fields``, in one query."""
+        if not (values and fields):
+            return None
+        docs = await self._fetch_documents(
+            index,
+            with_source(get_nested_query(values, fields), source)
+        )
+        return [doc['_source'] for doc in docs] if docs else None
+
+    async def iter_exact_doc_pages(
+            self,
+            index: str,
+            request: ListRequest,
+            fields: list[str] = [],
+            source: list[str] | None = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        async for hits in self._iter_pages(index, with_source(get_exact_query(request, fields), source)):
+            yield [doc['_source'] for doc in hits]
+
+    async def iter_nested_doc_pages(
+            self,
+            index: str,
+            query: str,
+            fields: list[str],
+            source: list[str] | None = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        if not fields:
+            return
+        async for hits in self._iter_pages(index, with_source(get_nested_query([query], fields), source)):
+            yield [doc['_source'] for doc in hits]
+
+    async def iter_document_pages(
+            self,
+            index: str,
+            query: dict[str, Any],
+            batch_size: int | None = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yields every hit of ``query`` page by page.
+
+        Pages are read from a point in time with ``search_after``, so each one
+        costs the same however deep it is, the walk is not capped by
+        ``max_result_window`` and concurrent writes do not shift it.
+        """
+        try:
+            pit = await self.elastic.open_point_in_time(
+                index=index,
+                keep_alive=settings.es_point_in_time_keep_alive
+            )
+        except NotFoundError:
+            return
+        pit_id = pit['id']
+        # _shard_doc breaks ties between equal sort values for search_after.
+        body = {**query, 'size': batch_size or settings.es_load_batch_size,
+                'sort': [*query.get('sort', []), {'_shard_doc': 'asc'}]}
         try:
-            if ('from' in query) and ('size' in query):
-                search_response = await self.elastic.search(index=index, body=query)
-                return search_response["hits"]["hits"]
-            result = []
-            from_, size = 0, settings.es_load_batch_size
             while True:
-                search_response = await self.elastic.search(
-                    index=index,
-                    body={
-                        **query,
-                        'from': from_,
-                        'size': size
-                    })
-                hits = search_response["hits"]["hits"]
+                search_response = await self.elastic.search(body={
+                    **body,
+                    'pit': {'id': pit_id, 'keep_alive': settings.es_point_in_time_keep_alive}
+                })
+                pit_id = search_response.get('pit_id', pit_id)
+                hits = search_response['hits']['hits']
                 if not hits:
                     break
-                from_ += size
-                result.extend(hits)
-            return result
-        except NotFoundError:
-            return None
+                yield hits
+                if len(hits) < body['size']:
+                    break
+                body['search_after'] = hits[-1]['sort']
+        finally:
+            await self.elastic.close_point_in_time(id=pit_id)
+
+    async def _fetch_documents(self, index: str, query: dict[str, Any]) -> list[dict[str, Any]] | None:
+        result = []
+        async for hits in self._iter_pages(index, query):
+            result.extend(hits)
+        return result
+
+    async def _iter_pages(self, index: str, query: dict[str, Any]) -> AsyncIterator[list[dict[str, Any]]]:
+        if ('from' in query) and ('size' in query):
+            try:
+                search_response = await self.elastic.search(index=index, body=query)
+            except NotFoundError:
+                return
+            if hits := search_response['hits']['hits']:
+                yield hits
+            return
+        async for hits in self.iter_document_pages(index, query):
+            yield hits
 
 
 def get_elastic_service(
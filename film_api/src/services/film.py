@@ -1,10 +1,10 @@
 from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
 from fastapi import Depends
 
-from .elastic import ElasticService, get_elastic_service
-from .redis import RedisService, get_redis_service
+from .elastic import ElasticService, get_elastic_service, get_source_fields
+from .redis import RedisService, get_redis_service, cached
 from .mixins import ServiceMixin
 from models.film import FilmInfo, FilmItem
 from models.common import ListRequest, SearchRequest
@@ -16,35 +16,48 @@ class FilmService(ServiceMixin):
         self.elastic_service = elastic_service
         self.valid_sort_options = {'imdb_rating': 'imdb_rating', 'title': 'title.raw'}
 
+    @cached('movies', id_of='movies')
     async def get_film_by_id(self, film_id: str) -> FilmInfo | None:
-        film = await self.redis_service.get_from_cache(self.get_film_by_id.__name__, film_id)
-        if not film:
-            film = await self.elastic_service.get_doc_by_id('movies', film_id)
-            if not film:
-                return None
-            film = FilmInfo(**film)
-            await self.redis_service.set_cache(self.get_film_by_id.__name__, film_id, value=film)
-        return film
+        film = await self.elastic_service.get_doc_by_id('movies', film_id, get_source_fields(FilmInfo))
+        return FilmInfo(**film) if film else None
 
+    async def get_films_by_ids(self, film_ids: list[str]) -> list[FilmInfo]:
+        """``get_film_by_id`` of many films, in request order, without those not found."""
+        films = await self.redis_service.get_or_fetch_many(
+            self._fetch_films,
+            FilmService.get_film_by_id.namespace,
+            film_ids
+        )
+        return [films[film_id] for film_id in film_ids if films[film_id]]
+
+    async def _fetch_films(self, film_ids: list[str]) -> dict[str, FilmInfo | None]:
+        films = await self.elastic_service.get_docs_by_ids('movies', film_ids, get_source_fields(FilmInfo))
+        return {film_id: FilmInfo(**films[film_id]) if film_id in films else None for film_id in film_ids}
+
+    @cached('movies', local=True)
     async def get_film_list(self, request: ListRequest) -> list[FilmItem]:
-        films = await self.redis_service.get_from_cache(self.get_film_list.__name__, request)
-        if not films:
-            films = await self.elastic_service.get_exact_docs('movies', request, ['genres'])
-            if not films:
-                return []
-            films = [FilmItem(**film) for film in films]
-            await self.redis_service.set_cache(self.get_film_list.__name__, request, value=films)
-        return films
+        films = await self.elastic_service.get_exact_docs('movies', request, ['genres'], get_source_fields(FilmItem))
+        return [FilmItem(**film) for film in films] if films else []
 
+    @cached('movies')
     async def search_films(self, request: SearchRequest) -> list[FilmItem]:
-        films = await self.redis_service.get_from_cache(self.search_films.__name__, request)
-        if not films:
-            films = await self.elastic_service.search_docs('movies', request, ['title', 'description'])
-            if not films:
-                return []
-            films = [FilmItem(**film) for film in films]
-            await self.redis_service.set_cache(self.search_films.__name__, request, value=films)
-        return films
+        films = await self.elastic_service.search_docs(
+            'movies',
+            request,
+            ['title', 'description'],
+            get_source_fields(FilmItem)
+        )
+        return [FilmItem(**film) for film in films] if films else []
+
+    async def iter_film_list_pages(self, request: ListRequest) -> AsyncIterator[list[FilmItem]]:
+        """Yields the films of ``get_film_list`` as they arrive, bypassing the cache."""
+        async for films in self.elastic_service.iter_exact_doc_pages(
+                'movies',
+                request,
+                ['genres'],
+                get_source_fields(FilmItem)
+        ):
+            yield [FilmItem(**film) for film in films]
 
 
 @lru_cache()
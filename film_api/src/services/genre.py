@@ -3,8 +3,8 @@ from typing import Annotated
 
 from fastapi import Depends
 
-from .elastic import ElasticService, get_elastic_service
-from .redis import RedisService, get_redis_service
+from .elastic import ElasticService, get_elastic_service, get_source_fields
+from .redis import RedisService, get_redis_service, cached
 from models.genre import Genre
 from models.common import ListRequest
 from .mixins import ServiceMixin
@@ -16,25 +16,28 @@ class GenreService(ServiceMixin):
         self.redis_service = redis_service
         self.valid_sort_options = {}
 
+    @cached('genre', local=True, id_of='genre')
     async def get_genre_by_id(self, genre_id: str) -> Genre | None:
-        genre = await self.redis_service.get_from_cache(self.get_genre_by_id.__name__, genre_id)
-        if not genre:
-            genre = await self.elastic_service.get_doc_by_id('genre', genre_id)
-            if not genre:
-                return None
-            genre = Genre(**genre)
-            await self.redis_service.set_cache(self.get_genre_by_id.__name__, genre_id, value=genre)
-        return genre
-
+        genre = await self.elastic_service.get_doc_by_id('genre', genre_id, get_source_fields(Genre))
+        return Genre(**genre) if genre else None
+
+    async def get_genres_by_ids(self, genre_ids: list[str]) -> list[Genre]:
+        """``get_genre_by_id`` of many genres, in request order, without those not found."""
+        genres = await self.redis_service.get_or_fetch_many(
+            self._fetch_genres,
+            GenreService.get_genre_by_id.namespace,
+            genre_ids
+        )
+        return [genres[genre_id] for genre_id in genre_ids if genres[genre_id]]
+
+    async def _fetch_genres(self, genre_ids: list[str]) -> dict[str, Genre | None]:
+        genres = await self.elastic_service.get_docs_by_ids('genre', genre_ids, get_source_fields(Genre))
+        return {genre_id: Genre(**genres[genre_id]) if genre_id in genres else None for genre_id in genre_ids}
+
+    @cached('genre', local=True)
     async def get_genres(self, request: ListRequest) -> list[Genre]:
-        genres = await self.redis_service.get_from_cache(self.get_genres.__name__, request)
-        if not genres:
-            genres = await self.elastic_service.get_exact_docs('genre', request, ['name'])
-            if not genres:
-                return []
-            genres = [Genre(**genre) for genre in genres]
-            await self.redis_service.set_cache(self.get_genres.__name__, request, value=genres)
-        return genres
+        genres = await self.elastic_service.get_exact_docs('genre', request, ['name'], get_source_fields(Genre))
+        return [Genre(**genre) for genre in genres] if genres else []
 
 
 @lru_cache()
@@ -0,0 +1,85 @@
+import json
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from core.config import settings
+from .cache_keys import get_id_cache_key
+from .redis import generations, local_cache, namespaces
+
+
+# Written by postgres_to_es after every bulk load: the index and, per kind
+# of id, the ids of the documents whose cached entries changed.
+INDEX_CHANGES_STREAM = f'{settings.project_name}:index-changes'
+# Id of the last message handled by any worker, where a starting worker
+# resumes, so changes published while every worker was down still apply.
+INDEX_CHANGES_LAST_ID_KEY = f'{INDEX_CHANGES_STREAM}:last-id'
+
+
+async def evict_changed_documents(redis: Redis, index: str, ids: dict[str, list[str]]) -> None:
+    # Entries of other namespaces of the index go with its bumped generation.
+    generations.invalidate(index)
+    keys = [
+        get_id_cache_key(settings.project_name, namespace, doc_id)
+        for namespace in namespaces
+        if namespace.index == index and namespace.id_of in ids
+        for doc_id in ids[namespace.id_of]
+    ]
+    for key in keys:
+        local_cache.evict(key)
+    if keys:
+        await redis.delete(*keys)
+
+
+async def get_stream_last_id(redis: Redis) -> str:
+    """Id of the newest message of the changes stream, '0-0' if there is none yet."""
+    try:
+        info = await redis.xinfo_stream(INDEX_CHANGES_STREAM)
+    except ResponseError:
+        # The stream is created by the first message.
+        return '0-0'
+    last_id = info['last-generated-id']
+    return last_id.decode() if isinstance(last_id, bytes) else last_id
+
+
+async def listen_for_index_changes(redis: Redis):
+    """Evicts cached documents reloaded by the ETL.
+
+    Every worker reads the whole stream, as each holds its own local cache;
+    deleting the Redis keys more than once is harmless, and so is replaying
+    messages when workers record their last ids out of order.
+    """
+    # Advanced only once a message's eviction succeeded, so a failed one is
+    # read again on retry.
+    handled_id = None
+    while True:
+        try:
+            if handled_id is None:
+                stored_last_id = await redis.get(INDEX_CHANGES_LAST_ID_KEY)
+                # Not '$': each read would then skip what was published
+                # since the previous one timed out.
+                handled_id = stored_last_id.decode() if stored_last_id else await get_stream_last_id(redis)
+            while True:
+                response = await redis.xread({INDEX_CHANGES_STREAM: handled_id}, count=100, block=5000)
+                for _, messages in response:
+                    for message_id, fields in messages:
+                        try:
+                            index, ids = _decode_change(fields)
+                        except (KeyError, ValueError):
+                            logging.exception('Skipping malformed index changes message %s', message_id)
+                        else:
+                            await evict_changed_documents(redis, index, ids)
+                        handled_id = message_id
+                    await redis.set(INDEX_CHANGES_LAST_ID_KEY, handled_id)
+        except Exception:
+            logging.exception('Index changes stream handling failed, retrying')
+            await asyncio.sleep(1)
+
+
+def _decode_change(fields: dict[bytes, bytes]) -> tuple[str, dict[str, list[str]]]:
+    ids = json.loads(fields[b'ids'])
+    if not isinstance(ids, dict):
+        raise ValueError(f'Expected ids by kind, got {ids!r}')
+    return fields[b'index'].decode(), ids
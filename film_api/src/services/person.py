@@ -1,13 +1,13 @@
 from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, Any, AsyncIterator
 
 from fastapi import Depends
 
-from .elastic import ElasticService, get_elastic_service
-from .redis import RedisService, get_redis_service
-from models.person import PersonFilm, Person
+from .elastic import ElasticService, get_elastic_service, get_source_fields
+from .redis import RedisService, get_redis_service, cached
+from models.person import PersonFilm, PersonInfo
 from models.common import SearchRequest
-from models.film import FilmInfo
+from models.film import FilmInfo, FilmItem
 
 
 class PersonService:
@@ -15,58 +15,97 @@ class PersonService:
         self.elastic_service = elastic_service
         self.redis_service = redis_service
 
-    async def get_person_by_id(self, person_id: str) -> Person | None:
-        person = await self.redis_service.get_from_cache(self.get_person_by_id.__name__, person_id)
-        if not person:
-            person = await self.elastic_service.get_doc_by_id('person', person_id)
-            if not person:
-                return None
-            person = Person(**person)
-            await self.redis_service.set_cache(self.get_person_by_id.__name__, person_id, value=person)
-        return person
+    @cached('person', id_of='person')
+    async def get_person_by_id(self, person_id: str) -> PersonInfo | None:
+        person = await self.elastic_service.get_doc_by_id('person', person_id, get_source_fields(PersonInfo))
+        return (await self._get_person_infos([person]))[0] if person else None
 
+    async def get_persons_by_ids(self, person_ids: list[str]) -> list[PersonInfo]:
+        """``get_person_by_id`` of many people, in request order, without those not found."""
+        people = await self.redis_service.get_or_fetch_many(
+            self._fetch_persons,
+            PersonService.get_person_by_id.namespace,
+            person_ids
+        )
+        return [people[person_id] for person_id in person_ids if people[person_id]]
+
+    async def _fetch_persons(self, person_ids: list[str]) -> dict[str, PersonInfo | None]:
+        people = await self.elastic_service.get_docs_by_ids('person', person_ids, get_source_fields(PersonInfo))
+        person_infos = {person.id: person for person in await self._get_person_infos(list(people.values()))}
+        return {person_id: person_infos.get(person_id) for person_id in person_ids}
+
+    @cached('movies', id_of='person')
     async def get_person_films(self, person_id: str) -> list[FilmInfo]:
-        films = await self.redis_service.get_from_cache(self.get_person_films.__name__, person_id)
-        if not films:
-            films = await self.elastic_service.get_exact_docs_by_nested(
-                'movies',
-                person_id,
-                ['actors.id', 'directors.id', 'writers.id']
-            )
-            if not films:
-                return []
-            films = [FilmInfo(**film) for film in films]
-            await self.redis_service.set_cache(self.get_person_films.__name__, person_id, value=films)
-        return films
+        films = await self.elastic_service.get_exact_docs_by_nested(
+            'movies',
+            person_id,
+            ['actors.id', 'directors.id', 'writers.id'],
+            get_source_fields(FilmInfo)
+        )
+        return [FilmInfo(**film) for film in films] if films else []
 
+    @cached('movies', id_of='person')
     async def get_person_film_roles(self, person_id) -> list[PersonFilm]:
-        film_roles = await self.redis_service.get_from_cache(self.get_person_film_roles.__name__, person_id)
-        if not film_roles:
-            films = await self.get_person_films(person_id)
-            if not films:
-                return []
-            film_roles = []
-            for film in films:
-                person_film = PersonFilm(id=film.id, roles=[])
-                if person_id in [actor.id for actor in film.actors]:
-                    person_film.roles.append('actor')
-                if person_id in [writer.id for writer in film.writers]:
-                    person_film.roles.append('writer')
-                if person_id in [director.id for director in film.directors]:
-                    person_film.roles.append('director')
-                film_roles.append(person_film)
-            await self.redis_service.set_cache(self.get_person_film_roles.__name__, person_id, value=film_roles)
+        films = await self.get_person_films(person_id)
+        return self._get_film_roles([person_id], films)[person_id]
+
+    async def get_film_roles_by_person_ids(self, person_ids: list[str]) -> dict[str, list[PersonFilm]]:
+        """``get_person_film_roles`` of many people, sharing its cache entries.
+
+        The people missing from the cache are looked up in a single query.
+        """
+        return await self.redis_service.get_or_fetch_many(
+            self._fetch_film_roles,
+            PersonService.get_person_film_roles.namespace,
+            person_ids
+        )
+
+    async def _fetch_film_roles(self, person_ids: list[str]) -> dict[str, list[PersonFilm]]:
+        films = await self.elastic_service.get_exact_docs_by_nested_terms(
+            'movies',
+            person_ids,
+            ['actors.id', 'directors.id', 'writers.id'],
+            get_source_fields(FilmInfo)
+        )
+        return self._get_film_roles(person_ids, [FilmInfo(**film) for film in films] if films else [])
+
+    def _get_film_roles(self, person_ids: list[str], films: list[FilmInfo]) -> dict[str, list[PersonFilm]]:
+        film_roles = {person_id: [] for person_id in person_ids}
+        for film in films:
+            roles = {}
+            for role, members in (('actor', film.actors), ('writer', film.writers), ('director', film.directors)):
+                for member in members:
+                    if member.id in film_roles and role not in roles.setdefault(member.id, []):
+                        roles[member.id].append(role)
+            for person_id, person_roles in roles.items():
+                film_roles[person_id].append(PersonFilm(id=film.id, roles=person_roles))
         return film_roles
 
-    async def search_persons(self, request: SearchRequest) -> list[Person]:
-        people = await self.redis_service.get_from_cache(self.search_persons.__name__, request)
-        if not people:
-            people = await self.elastic_service.search_docs('person', request, ['full_name'])
-            if not people:
-                return []
-            people = [Person(**person) for person in people]
-            await self.redis_service.set_cache(self.search_persons.__name__, request, value=people)
-        return people
+    @cached('person')
+    async def search_persons(self, request: SearchRequest) -> list[PersonInfo]:
+        people = await self.elastic_service.search_docs('person', request, ['full_name'], get_source_fields(PersonInfo))
+        return await self._get_person_infos(people) if people else []
+
+    async def _get_person_infos(self, people: list[dict[str, Any]]) -> list[PersonInfo]:
+        # The ETL stores each person's films with the person; documents
+        # loaded before it did have their roles looked up in the movies.
+        film_roles = await self.get_film_roles_by_person_ids(
+            [person['id'] for person in people if 'films' not in person]
+        )
+        return [
+            PersonInfo(**person) if 'films' in person else PersonInfo(**person, films=film_roles[person['id']])
+            for person in people
+        ]
+
+    async def iter_person_film_pages(self, person_id: str) -> AsyncIterator[list[FilmItem]]:
+        """Yields the films of ``get_person_films`` as they arrive, bypassing the cache."""
+        async for films in self.elastic_service.iter_nested_doc_pages(
+            'movies',
+            person_id,
+            ['actors.id', 'directors.id', 'writers.id'],
+            get_source_fields(FilmItem)
+        ):
+            yield [FilmItem(**film) for film in films]
 
 
 @lru_cache()
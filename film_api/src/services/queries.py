@@ -0,0 +1,49 @@
+"""Elasticsearch request bodies built by ElasticService.
+
+Exact matches go in filter context: sorted lists throw relevance scores
+away, and filters skip scoring and are cached by Elasticsearch's node
+query cache. The API never returns hit counts, so no search tracks them.
+"""
+from typing import Any
+
+from models.common import ListRequest, SearchRequest
+
+
+def get_search_query(request: SearchRequest, fields: list[str]) -> dict[str, Any]:
+    """Full-text search of ``request.query`` in any of ``fields``, by relevance."""
+    return {
+        'from': request.page_number * request.page_size,
+        'size': request.page_size,
+        'query': {'bool': {'should': [{'match': {field: request.query}} for field in fields]}},
+        'track_total_hits': False
+    }
+
+
+def get_exact_query(request: ListRequest, fields: list[str]) -> dict[str, Any]:
+    """Documents with ``request.query`` as a whole in any of ``fields``, or all of them."""
+    body = {'query': {'match_all': {}}, 'track_total_hits': False}
+    if request.query and fields:
+        body['query'] = {'bool': {'filter': [_any_of([{'term': {field: request.query}} for field in fields])]}}
+    if (request.page_number is not None) and (request.page_size is not None):
+        body['size'], body['from'] = request.page_size, request.page_number * request.page_size
+    if request.sort:
+        body['sort'] = [{request.sort[1:]: 'desc' if request.sort[0] == '-' else 'asc'}]
+    return body
+
+
+def get_nested_query(values: list[str], fields: list[str]) -> dict[str, Any]:
+    """Documents with any of ``values`` in any of the nested ``fields``, e.g. ``actors.id``."""
+    nested_queries = []
+    for field in fields:
+        arr, _ = field.split('.')
+        nested_queries.append({'nested': {'path': arr, 'query': {'terms': {field: values}}}})
+    return {'query': {'bool': {'filter': [_any_of(nested_queries)]}}, 'track_total_hits': False}
+
+
+def with_source(query: dict[str, Any], source: list[str] | None) -> dict[str, Any]:
+    return {**query, '_source': source} if source is not None else query
+
+
+def _any_of(clauses: list[dict[str, Any]]) -> dict[str, Any]:
+    # should inside a filter matches any clause, still without scoring.
+    return clauses[0] if len(clauses) == 1 else {'bool': {'should': clauses}}
@@ -1,33 +1,360 @@
-import pickle
-from typing import Annotated
+import math
+import time
+import random
+import asyncio
+import logging
+import functools
+from uuid import uuid4
+from typing import Annotated, Any, Awaitable, Callable, NamedTuple, get_type_hints
 
 from redis import Redis
+from redis.exceptions import RedisError
 from fastapi import Depends
 
+from core.cache import LocalCache
 from core.config import settings
 from db.redis import get_redis
+from .codecs import CacheCodec, CacheEntry, JsonCodec, ValueType
+from .cache_keys import CacheNamespace, Generations, get_cache_key, get_id_cache_key
+from .single_flight import SingleFlight, RedisLock, single_flight
+
+
+# Background refreshes, referenced until done so they are not collected.
+refresh_tasks: set[asyncio.Task] = set()
+
+# In-process tier for small, hot values, kept in sync over pub/sub.
+local_cache = LocalCache(
+    settings.local_cache_size,
+    settings.local_cache_max_bytes,
+    settings.local_cache_expiry_in_seconds
+)
+CACHE_INVALIDATION_CHANNEL = 'cache-invalidation'
+# Prefixes invalidation messages so a worker skips its own.
+WORKER_ID = uuid4().bytes
+
+cache_codec = JsonCodec(settings.cache_compress_min_bytes)
+generations = Generations(settings.project_name, settings.cache_generation_check_seconds)
+# Every cached method, for evicting entries by document id.
+namespaces: list[CacheNamespace] = []
+
+
+class RedisTierStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+
+redis_tier_stats = RedisTierStats()
+
+
+class CacheSlot(NamedTuple):
+    """Where a value is cached and how to read it back."""
+    key: str
+    value_type: ValueType
+    local: bool
 
 
 class RedisService:
-    def __init__(self, redis: Redis, cache_invalidation: int):
+    def __init__(
+            self,
+            redis: Redis,
+            cache_invalidation: int,
+            single_flight: SingleFlight,
+            lock_timeout_ms: int,
+            lock_poll_interval_ms: int,
+            stale_ttl: int = 0,
+            early_refresh_beta: float = 1.0,
+            codec: CacheCodec = cache_codec,
+            negative_ttl: int = 0
+    ):
         self.redis = redis
         self.cache_invalidation = cache_invalidation
+        self.single_flight = single_flight
+        self.lock_timeout_ms = lock_timeout_ms
+        self.lock_poll_interval_ms = lock_poll_interval_ms
+        self.stale_ttl = stale_ttl
+        self.early_refresh_beta = early_refresh_beta
+        self.codec = codec
+        self.negative_ttl = negative_ttl
+
+    async def get_or_fetch(
+            self,
+            fetch: Callable[[], Awaitable[Any]],
+            namespace: CacheNamespace,
+            *args,
+            **kwargs
+    ):
+        """Returns the cached value or, on a miss, the result of ``fetch``.
+
+        Concurrent misses for the same key share one ``fetch`` per worker,
+        and across workers only the holder of a short Redis lock runs it
+        while the others wait for the cache to be filled. Empty results
+        (not found, no hits) are cached for ``negative_ttl`` seconds, if any,
+        without a stale period.
+
+        Values are fresh for ``cache_invalidation`` seconds and then served
+        stale for up to ``stale_ttl`` more while one background refresh
+        replaces them. Refreshes start early with a probability that grows
+        as expiry nears (XFetch), so hot keys rarely go stale at all.
+
+        For a ``local`` namespace the value is also kept in this worker's
+        memory for ``LOCAL_CACHE_EXPIRY_IN_SECONDS``; other workers drop
+        their copy when it is replaced.
+        """
+        key = await self._get_cache_key(namespace, args, kwargs)
+        slot = CacheSlot(key, namespace.value_type, namespace.local)
+        entry = await self._get(slot)
+        if entry is None:
+            return await self.single_flight.do(slot.key, lambda: self._fetch(slot, fetch))
+        if self._should_refresh(entry):
+            self._schedule_refresh(slot, fetch)
+        return entry.value
+
+    async def get_or_fetch_many(
+            self,
+            fetch_many: Callable[[list[str]], Awaitable[dict[str, Any]]],
+            namespace: CacheNamespace,
+            doc_ids: list[str]
+    ) -> dict[str, Any]:
+        """Returns the values of an ``id_of`` namespace for many ids at once.
+
+        The entries are those of the namespace's own method, read with one
+        MGET; the ids they miss are passed together to ``fetch_many``, which
+        returns a value for each of them, and stored in one pipeline. Unlike
+        ``get_or_fetch``, misses are not coalesced with concurrent fetches;
+        stale entries are refreshed one by one as usual.
+        """
+        slots = {
+            doc_id: CacheSlot(
+                get_id_cache_key(settings.project_name, namespace, doc_id),
+                namespace.value_type,
+                namespace.local
+            )
+            for doc_id in doc_ids
+        }
+        entries = await self._get_many(list(slots.values()))
+        values, missing = {}, []
+        for (doc_id, slot), entry in zip(slots.items(), entries):
+            if entry is None:
+                missing.append(doc_id)
+                continue
+            if self._should_refresh(entry):
+                self._schedule_refresh(slot, functools.partial(self._fetch_one, fetch_many, doc_id))
+            values[doc_id] = entry.value
+        if missing:
+            started = time.monotonic()
+            fetched = await fetch_many(missing)
+            await self._set_many(
+                [(slots[doc_id], fetched[doc_id]) for doc_id in missing if fetched[doc_id] or self.negative_ttl],
+                time.monotonic() - started
+            )
+            values.update(fetched)
+        return values
+
+    async def _fetch_one(self, fetch_many: Callable[[list[str]], Awaitable[dict[str, Any]]], doc_id: str):
+        return (await fetch_many([doc_id]))[doc_id]
+
+    def _should_refresh(self, entry: CacheEntry) -> bool:
+        # XFetch: -log(random()) is exponentially distributed, so the expected
+        # head start is fetch_seconds * beta and expensive values go earlier.
+        head_start = -entry.fetch_seconds * self.early_refresh_beta * math.log(1.0 - random.random())
+        return time.time() + head_start >= entry.fresh_until
+
+    def _schedule_refresh(self, slot: CacheSlot, fetch: Callable[[], Awaitable[Any]]):
+        # Refreshes get their own key: a miss must never await one, as a
+        # refresh returns None when it gives way to another replica or fails.
+        refresh_key = ('refresh', slot.key)
+        if refresh_key in self.single_flight:
+            return
+        task = asyncio.create_task(self.single_flight.do(refresh_key, lambda: self._refresh(slot, fetch)))
+        refresh_tasks.add(task)
+        task.add_done_callback(refresh_tasks.discard)
+
+    async def _refresh(self, slot: CacheSlot, fetch: Callable[[], Awaitable[Any]]):
+        lock = RedisLock(self.redis, self._get_lock_key(slot.key), self.lock_timeout_ms)
+        if not await lock.acquire():
+            # Another replica is already refreshing the key.
+            return None
+        try:
+            value = await self._fetch_and_store(slot, fetch)
+            if not value and not self.negative_ttl:
+                await self._delete(slot)
+            return value
+        except Exception:
+            logging.exception('Failed to refresh a cached value')
+        finally:
+            await lock.release()
+
+    async def _fetch(self, slot: CacheSlot, fetch: Callable[[], Awaitable[Any]]):
+        lock = RedisLock(self.redis, self._get_lock_key(slot.key), self.lock_timeout_ms)
+        if not await lock.acquire():
+            entry = await self._wait_for(slot, lock)
+            if entry is not None:
+                return entry.value
+        try:
+            return await self._fetch_and_store(slot, fetch)
+        finally:
+            await lock.release()
+
+    async def _fetch_and_store(self, slot: CacheSlot, fetch: Callable[[], Awaitable[Any]]):
+        started = time.monotonic()
+        value = await fetch()
+        if value or self.negative_ttl:
+            await self._set(slot, value, time.monotonic() - started)
+        return value
+
+    async def _wait_for(self, slot: CacheSlot, lock: RedisLock) -> CacheEntry | None:
+        # Gives up once the lock is gone without a cached value, i.e. the
+        # holder failed or got an uncached empty result, and the caller
+        # fetches itself.
+        for _ in range(self.lock_timeout_ms // self.lock_poll_interval_ms):
+            await asyncio.sleep(self.lock_poll_interval_ms / 1000)
+            entry = await self._get(slot)
+            if entry is not None or not await lock.is_held():
+                return entry
+        return None
+
+    async def _get(self, slot: CacheSlot) -> CacheEntry | None:
+        if slot.local and (entry := local_cache.get(slot.key)) is not None:
+            return entry
+        return self._read(slot, await self.redis.get(slot.key))
+
+    async def _get_many(self, slots: list[CacheSlot]) -> list[CacheEntry | None]:
+        entries = [local_cache.get(slot.key) if slot.local else None for slot in slots]
+        missed = [i for i, entry in enumerate(entries) if entry is None]
+        if missed:
+            cached_results = await self.redis.mget([slots[i].key for i in missed])
+            for i, cached_result in zip(missed, cached_results):
+                entries[i] = self._read(slots[i], cached_result)
+        return entries
+
+    def _read(self, slot: CacheSlot, cached_result: bytes | None) -> CacheEntry | None:
+        # Entries in a format or schema this worker cannot read count as misses.
+        entry = self.codec.decode(cached_result, slot.value_type) if cached_result else None
+        if entry is None:
+            redis_tier_stats.misses += 1
+            return None
+        redis_tier_stats.hits += 1
+        if slot.local:
+            local_cache.set(slot.key, entry, len(cached_result))
+        return entry
+
+    async def _set(self, slot: CacheSlot, value, fetch_seconds: float):
+        await self._set_many([(slot, value)], fetch_seconds)
+
+    async def _set_many(self, items: list[tuple[CacheSlot, Any]], fetch_seconds: float):
+        if not items:
+            return
+        stored = []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for slot, value in items:
+                if value:
+                    fresh_ttl, ttl = self.cache_invalidation, self.cache_invalidation + self.stale_ttl
+                else:
+                    fresh_ttl = ttl = self.negative_ttl
+                entry = CacheEntry(value, time.time() + fresh_ttl, fetch_seconds)
+                data = self.codec.encode(entry, slot.value_type)
+                pipe.set(slot.key, data, ttl)
+                if slot.local:
+                    pipe.publish(CACHE_INVALIDATION_CHANNEL, WORKER_ID + slot.key.encode())
+                stored.append((slot, entry, len(data)))
+            await pipe.execute()
+        for slot, entry, size in stored:
+            if slot.local:
+                local_cache.set(slot.key, entry, size)
+
+    async def _delete(self, slot: CacheSlot):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(slot.key)
+            if slot.local:
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, WORKER_ID + slot.key.encode())
+            await pipe.execute()
+        local_cache.evict(slot.key)
+
+    def _get_lock_key(self, key: str) -> str:
+        return f'{key}:lock'
+
+    async def _get_cache_key(self, namespace: CacheNamespace, args, kwargs) -> str:
+        generation = await generations.get(self.redis, namespace.index) if not namespace.id_of else 0
+        return get_cache_key(settings.project_name, namespace, generation, args, kwargs)
+
+
+def cached(index: str, local: bool = False, id_of: str | None = None):
+    """Caches a service method's result through the service's ``redis_service``.
+
+    The method's qualified name, the generation of ``index`` and its
+    arguments make up the cache key; the method itself only fetches the
+    value, and an empty result is cached only briefly. Values are encoded
+    as the method's return annotation. ``local=True`` also keeps the value
+    in the worker's memory, which suits small values read on most requests.
+
+    Methods taking a single document id declare its kind with ``id_of``
+    (an index name); their entries are evicted when the ETL reloads
+    ``index`` documents related to that id (see services.index_changes).
+    The wrapper's ``namespace`` lets batched lookups share those entries
+    (see ``RedisService.get_or_fetch_many``).
+    """
+    def decorator(method):
+        namespace = CacheNamespace(
+            method.__qualname__,
+            index,
+            ValueType(get_type_hints(method)['return']),
+            local,
+            id_of
+        )
+        namespaces.append(namespace)
 
-    async def get_from_cache(self, *args, **kwargs):
-        key = self._get_cache_key(args, kwargs)
-        cached_result = await self.redis.get(key)
-        return pickle.loads(cached_result) if cached_result else None
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            return await self.redis_service.get_or_fetch(
+                lambda: method(self, *args, **kwargs),
+                namespace,
+                *args,
+                **kwargs
+            )
+        wrapper.namespace = namespace
+        return wrapper
+    return decorator
 
-    async def set_cache(self, *args, value, **kwargs):
-        key = self._get_cache_key(args, kwargs)
-        await self.redis.set(key, pickle.dumps(value), self.cache_invalidation)
 
-    def _get_cache_key(self, *args, **kwargs):
-        sorted_kwargs = sorted(kwargs.items())
-        return pickle.dumps(args) + pickle.dumps(sorted_kwargs)
+async def listen_for_cache_invalidation(redis: Redis):
+    """Drops local_cache entries replaced or deleted by other workers."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                # Invalidations published while we were not subscribed are lost.
+                local_cache.clear()
+                async for message in pubsub.listen():
+                    if message['type'] != 'message':
+                        continue
+                    worker_id, key = message['data'][:len(WORKER_ID)], message['data'][len(WORKER_ID):]
+                    if worker_id != WORKER_ID:
+                        local_cache.evict(key.decode())
+        except RedisError:
+            logging.exception('Cache invalidation subscription failed, resubscribing')
+            await asyncio.sleep(1)
 
 
 def get_redis_service(
         redis: Annotated[Redis, Depends(get_redis)]
 ) -> RedisService:
-    return RedisService(redis, settings.default_cache_expiry_in_seconds)
+    return RedisService(
+        redis,
+        settings.default_cache_expiry_in_seconds,
+        single_flight,
+        settings.cache_lock_timeout_ms,
+        settings.cache_lock_poll_interval_ms,
+        settings.cache_stale_expiry_in_seconds,
+        settings.cache_early_refresh_beta,
+        cache_codec,
+        settings.cache_negative_expiry_in_seconds
+    )
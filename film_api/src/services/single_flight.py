@@ -0,0 +1,59 @@
+import asyncio
+from uuid import uuid4
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+
+
+# Deletes the lock only if it is still held by the caller.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one.
+
+    Calls made while another one for the key is in progress in this process
+    await the same task instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls: dict[Any, asyncio.Future] = {}
+
+    async def do(self, key, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        # A cancelled caller must not cancel the call for everyone else.
+        return await asyncio.shield(call)
+
+    def __contains__(self, key) -> bool:
+        return key in self._calls
+
+
+class RedisLock:
+    """Short-lived lock that lets one replica load a key while others wait."""
+
+    def __init__(self, redis: Redis, key, timeout_ms: int):
+        self.redis = redis
+        self.key = key
+        self.timeout_ms = timeout_ms
+        self.token = uuid4().hex
+
+    async def acquire(self) -> bool:
+        return bool(await self.redis.set(self.key, self.token, nx=True, px=self.timeout_ms))
+
+    async def release(self) -> None:
+        await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, self.key, self.token)
+
+    async def is_held(self) -> bool:
+        return bool(await self.redis.exists(self.key))
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,100 @@
+"""Compares cache codecs on the films.json test data.
+
+Three payloads are built from the test films: one ``FilmInfo``, a page of
+50 ``FilmItem`` and 500 ``FilmInfo`` (a prolific person's films). Each is
+encoded as a cache entry by every codec; the report shows encode and decode
+time, encoded size and the memory Redis reports for the stored key.
+
+Run from ``film_api/src`` against a disposable Redis:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_cache_codecs.py
+"""
+import json
+import time
+import pickle
+import timeit
+from pathlib import Path
+
+from redis import Redis
+
+from core.config import settings
+from models.film import FilmInfo, FilmItem
+from services.codecs import CacheCodec, CacheEntry, JsonCodec, ValueType
+
+
+FILMS_PATH = Path(__file__).parents[1] / 'functional' / 'testdata' / 'films.json'
+REPEAT = 200
+
+
+class PickleCodec(CacheCodec):
+    """The former format, for comparison only: unpickling cached data is unsafe."""
+
+    def encode(self, entry: CacheEntry, value_type: ValueType) -> bytes:
+        return pickle.dumps(entry)
+
+    def decode(self, data: bytes, value_type: ValueType) -> CacheEntry | None:
+        return pickle.loads(data)
+
+
+CODECS = {
+    'pickle': PickleCodec(),
+    'json': JsonCodec(compress_min_bytes=2 ** 62),
+    'json+zlib': JsonCodec(compress_min_bytes=0),
+}
+
+
+def load_films(count: int) -> list[FilmInfo]:
+    with open(FILMS_PATH) as raw_films:
+        films = json.load(raw_films)
+    return [
+        FilmInfo(**{**films[i % len(films)], 'id': f'{films[i % len(films)]["id"]}-{i}'})
+        for i in range(count)
+    ]
+
+
+def build_payloads() -> dict[str, tuple[ValueType, object]]:
+    return {
+        'FilmInfo': (ValueType(FilmInfo), load_films(1)[0]),
+        '50 FilmItem': (
+            ValueType(list[FilmItem]),
+            [FilmItem(**film.model_dump()) for film in load_films(50)]
+        ),
+        '500 FilmInfo': (ValueType(list[FilmInfo]), load_films(500)),
+    }
+
+
+def measure(redis: Redis, codec, value_type: ValueType, value) -> dict[str, float]:
+    entry = CacheEntry(value, time.time() + 30, 0.01)
+    data = codec.encode(entry, value_type)
+    assert codec.decode(data, value_type).value == value
+    encode_seconds = timeit.timeit(lambda: codec.encode(entry, value_type), number=REPEAT) / REPEAT
+    decode_seconds = timeit.timeit(lambda: codec.decode(data, value_type), number=REPEAT) / REPEAT
+    redis.set('bench_cache_codecs', data)
+    return {
+        'encode_us': encode_seconds * 1e6,
+        'decode_us': decode_seconds * 1e6,
+        'size': len(data),
+        'redis_memory': redis.memory_usage('bench_cache_codecs'),
+    }
+
+
+def main():
+    redis = Redis(host=settings.redis_host, port=settings.redis_port)
+    try:
+        for payload_name, (value_type, value) in build_payloads().items():
+            print(payload_name)
+            for codec_name, codec in CODECS.items():
+                result = measure(redis, codec, value_type, value)
+                print(
+                    f'  {codec_name:<10} encode {result["encode_us"]:>9.1f} us '
+                    f'decode {result["decode_us"]:>9.1f} us '
+                    f'{result["size"]:>9} B '
+                    f'{result["redis_memory"]:>9} B in Redis'
+                )
+    finally:
+        redis.delete('bench_cache_codecs')
+        redis.close()
+
+
+if __name__ == '__main__':
+    main()
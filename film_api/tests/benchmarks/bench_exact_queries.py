@@ -0,0 +1,65 @@
+"""Compares scored and filter-context film list queries on the test index.
+
+The "scored" body is the former one: genre terms in ``bool.should`` and
+total hits counted. The "filter" body is what ``get_exact_query`` builds
+now. Both are sent with the shard request cache off, so every search runs
+the query; the report shows the median ``took`` and round-trip time.
+
+Run from ``film_api/src`` against an Elasticsearch with the movies index
+loaded (e.g. the functional tests' one):
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_exact_queries.py
+"""
+import time
+import asyncio
+import statistics
+
+from elasticsearch import AsyncElasticsearch
+
+from core.config import settings
+from models.common import ListRequest
+from services.queries import get_exact_query
+
+
+REPEAT = 500
+INDEX = 'movies'
+REQUEST = ListRequest(page_number=0, page_size=50, sort='-imdb_rating', query='Action')
+
+
+def scored_query(request: ListRequest, fields: list[str]) -> dict:
+    body = {
+        'query': {'bool': {'should': [{'term': {field: request.query}} for field in fields]}},
+        'size': request.page_size,
+        'from': request.page_number * request.page_size
+    }
+    body['sort'] = [{request.sort[1:]: 'desc' if request.sort[0] == '-' else 'asc'}]
+    return body
+
+
+async def measure(es: AsyncElasticsearch, body: dict) -> tuple[float, float]:
+    took, round_trips = [], []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        response = await es.search(index=INDEX, body=body, request_cache=False)
+        round_trips.append(time.perf_counter() - started)
+        took.append(response['took'])
+    return statistics.median(took), statistics.median(round_trips)
+
+
+async def main():
+    es = AsyncElasticsearch(
+        hosts=[f'{settings.elastic_scheme}://{settings.elastic_host}:{settings.elastic_port}'])
+    try:
+        bodies = {
+            'scored': scored_query(REQUEST, ['genres']),
+            'filter': get_exact_query(REQUEST, ['genres']),
+        }
+        for name, body in bodies.items():
+            took, round_trip = await measure(es, body)
+            print(f'{name:<8} took {took:>6.1f} ms  round trip {round_trip * 1000:>7.2f} ms')
+    finally:
+        await es.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
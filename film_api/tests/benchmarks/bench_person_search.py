@@ -0,0 +1,85 @@
+"""Measures person search page latency against page size, cold and warm.
+
+A page of people from the person index gets its film roles resolved as
+``/api/v1/persons/search`` did before, one ``get_person_film_roles`` per
+person, and as it does now, with ``get_film_roles_by_person_ids``. The
+"cold" runs start from an empty Redis, the "warm" ones read cached roles.
+
+Run from ``film_api/src`` against a disposable Redis and an Elasticsearch
+with the movies and person indexes loaded:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_person_search.py
+"""
+import time
+import asyncio
+import statistics
+
+from redis.asyncio import Redis
+from elasticsearch import AsyncElasticsearch
+
+from core.config import settings
+from services.elastic import ElasticService
+from services.person import PersonService
+from services.redis import RedisService
+from services.single_flight import SingleFlight
+
+
+PAGE_SIZES = (1, 10, 50)
+REPEAT = 20
+
+
+async def per_person(service: PersonService, person_ids: list[str]):
+    for person_id in person_ids:
+        await service.get_person_film_roles(person_id)
+
+
+async def batched(service: PersonService, person_ids: list[str]):
+    await service.get_film_roles_by_person_ids(person_ids)
+
+
+async def measure(resolve, service: PersonService, redis: Redis, person_ids: list[str], warm: bool) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        await redis.flushdb()
+        if warm:
+            await resolve(service, person_ids)
+        started = time.perf_counter()
+        await resolve(service, person_ids)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+async def main():
+    redis = Redis(host=settings.redis_host, port=settings.redis_port)
+    es = AsyncElasticsearch(
+        hosts=[f'{settings.elastic_scheme}://{settings.elastic_host}:{settings.elastic_port}'])
+    service = PersonService(
+        ElasticService(es),
+        RedisService(
+            redis,
+            settings.default_cache_expiry_in_seconds,
+            SingleFlight(),
+            settings.cache_lock_timeout_ms,
+            settings.cache_lock_poll_interval_ms
+        )
+    )
+    try:
+        people = await es.search(index='person', body={'size': max(PAGE_SIZES), 'query': {'match_all': {}}})
+        all_person_ids = [person['_id'] for person in people['hits']['hits']]
+        for page_size in PAGE_SIZES:
+            person_ids = all_person_ids[:page_size]
+            for warm in (False, True):
+                before = await measure(per_person, service, redis, person_ids, warm)
+                after = await measure(batched, service, redis, person_ids, warm)
+                print(
+                    f'{len(person_ids):>3} people {"warm" if warm else "cold"}  '
+                    f'per person {before * 1000:>8.1f} ms  batched {after * 1000:>8.1f} ms'
+                )
+    finally:
+        await redis.flushdb()
+        await redis.close()
+        await es.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
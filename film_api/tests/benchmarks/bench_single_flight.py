@@ -0,0 +1,108 @@
+"""Measures Elasticsearch load when a popular cache key expires under traffic.
+
+Each wave drops the cached film list and fires concurrent requests for it
+from three simulated replicas, like the nginx-balanced film API. The
+"check-then-fetch" run reproduces the former service code (GET, query
+Elasticsearch on a miss, SET); the "single-flight" run goes through the
+``cached`` service method. Elasticsearch queries are counted from the
+index search stats.
+
+Run from ``film_api/src`` against a Redis and an Elasticsearch with the
+movies index loaded:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_single_flight.py
+"""
+import time
+import pickle
+import asyncio
+
+from redis.asyncio import Redis
+from elasticsearch import AsyncElasticsearch
+
+from core.config import settings
+from models.common import ListRequest
+from services.elastic import ElasticService
+from services.film import FilmService
+from services.redis import RedisService
+from services.single_flight import SingleFlight
+
+
+REPLICAS = 3
+REQUESTS_PER_REPLICA = 100
+WAVES = 20
+INDEX = 'movies'
+
+
+class CheckThenFetchFilmService(FilmService):
+    async def get_film_list(self, request: ListRequest):
+        key = pickle.dumps((self.get_film_list.__name__, request))
+        films = await self.redis_service.redis.get(key)
+        if films:
+            return pickle.loads(films)
+        films = await FilmService.get_film_list.__wrapped__(self, request)
+        if films:
+            await self.redis_service.redis.set(key, pickle.dumps(films), settings.default_cache_expiry_in_seconds)
+        return films
+
+
+async def count_queries(es: AsyncElasticsearch) -> int:
+    stats = await es.indices.stats(index=INDEX, metric='search')
+    return stats['_all']['total']['search']['query_total']
+
+
+async def run(service_class, redis: Redis, es: AsyncElasticsearch) -> dict[str, float]:
+    replicas = [
+        service_class(
+            RedisService(
+                redis,
+                settings.default_cache_expiry_in_seconds,
+                SingleFlight(),
+                settings.cache_lock_timeout_ms,
+                settings.cache_lock_poll_interval_ms
+            ),
+            ElasticService(es)
+        )
+        for _ in range(REPLICAS)
+    ]
+    request = ListRequest(page_number=0, page_size=50, sort='-imdb_rating')
+    queries_before = await count_queries(es)
+    started = time.perf_counter()
+    for _ in range(WAVES):
+        await redis.flushdb()
+        await asyncio.gather(*(
+            service.get_film_list(request.model_copy())
+            for service in replicas
+            for _ in range(REQUESTS_PER_REPLICA)
+        ))
+    elapsed = time.perf_counter() - started
+    queries = await count_queries(es) - queries_before
+    return {
+        'queries_per_wave': queries / WAVES,
+        'es_qps': queries / elapsed,
+        'elapsed_s': elapsed,
+    }
+
+
+def report(name: str, result: dict[str, float]):
+    print(
+        f'{name:<16} {result["queries_per_wave"]:>8.1f} ES queries/wave '
+        f'{result["es_qps"]:>8.0f} ES queries/s '
+        f'{result["elapsed_s"]:>8.2f} s'
+    )
+
+
+async def main():
+    redis = Redis(host=settings.redis_host, port=settings.redis_port)
+    es = AsyncElasticsearch(
+        hosts=[f'{settings.elastic_scheme}://{settings.elastic_host}:{settings.elastic_port}'])
+    try:
+        report('check-then-fetch', await run(CheckThenFetchFilmService, redis, es))
+        report('single-flight', await run(FilmService, redis, es))
+    finally:
+        await redis.flushdb()
+        await redis.close()
+        await es.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Measures what source filtering saves on list and search responses.
+
+Film documents are rebuilt from films.json as the ETL indexes them, with
+the ``*_names`` strings, and wrapped in a search response of 50 hits. The
+report compares the full ``_source`` with the ``FilmItem`` projection the
+list and search endpoints now request: response bytes and the time to
+parse the response and build the models. Cached pages are not affected,
+as they only ever held the model fields.
+
+Run from ``film_api/src``:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_source_filtering.py
+"""
+import json
+import timeit
+from pathlib import Path
+
+from models.film import FilmItem
+from services.elastic import get_source_fields
+
+
+FILMS_PATH = Path(__file__).parents[1] / 'functional' / 'testdata' / 'films.json'
+PAGE_SIZE = 50
+REPEAT = 500
+
+
+def load_documents(count: int) -> list[dict]:
+    with open(FILMS_PATH) as raw_films:
+        films = json.load(raw_films)
+    documents = []
+    for i in range(count):
+        film = {**films[i % len(films)], 'id': f'{films[i % len(films)]["id"]}-{i}'}
+        for field in ('actors', 'writers', 'directors'):
+            film[f'{field}_names'] = ', '.join(person['name'] for person in film[field])
+        documents.append(film)
+    return documents
+
+
+def search_response(sources: list[dict]) -> bytes:
+    hits = [{'_index': 'movies', '_id': source['id'], '_score': 1.0, '_source': source} for source in sources]
+    return json.dumps({'hits': {'total': {'value': len(hits), 'relation': 'eq'}, 'hits': hits}}).encode()
+
+
+def build_page(response: bytes) -> list[FilmItem]:
+    return [FilmItem(**hit['_source']) for hit in json.loads(response)['hits']['hits']]
+
+
+def main():
+    documents = load_documents(PAGE_SIZE)
+    fields = get_source_fields(FilmItem)
+    responses = {
+        'full _source': search_response(documents),
+        'FilmItem fields': search_response([{field: doc[field] for field in fields} for doc in documents]),
+    }
+    for name, response in responses.items():
+        parse_seconds = timeit.timeit(lambda: build_page(response), number=REPEAT) / REPEAT
+        print(
+            f'{name:<16} {len(response):>8} B response  '
+            f'parse {parse_seconds * 1e6:>8.1f} us'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Compares the buffered and the NDJSON streaming film list on peak RSS and time to first byte.
+
+Both modes serve an unpaginated ``GET /api/v1/films/`` from Elasticsearch,
+bypassing the cache: "buffered" builds the whole list, rebuilds every item
+as the route does and serializes the result in one go; "ndjson" writes each
+page of documents as it arrives. Each mode runs in a fresh interpreter so
+its peak RSS is its own.
+
+Run from ``film_api/src`` against an Elasticsearch with a large movies index:
+
+    PYTHONPATH=. python ../tests/benchmarks/bench_streaming.py
+"""
+import sys
+import json
+import time
+import asyncio
+import resource
+import subprocess
+
+from elasticsearch import AsyncElasticsearch
+from pydantic import TypeAdapter
+
+from core.config import settings
+from models.common import ListRequest
+from models.film import FilmItem
+from services.elastic import ElasticService
+from services.film import FilmService
+
+
+MODES = ('buffered', 'ndjson')
+
+
+async def buffered(service: FilmService, request: ListRequest):
+    films = await FilmService.get_film_list.__wrapped__(service, request)
+    films = [FilmItem(**film.model_dump()) for film in films]
+    yield TypeAdapter(list[FilmItem]).dump_json(films)
+
+
+async def ndjson(service: FilmService, request: ListRequest):
+    async for page in service.iter_film_list_pages(request):
+        yield b''.join(film.model_dump_json().encode() + b'\n' for film in page)
+
+
+async def run(mode: str) -> dict[str, float]:
+    es = AsyncElasticsearch(
+        hosts=[f'{settings.elastic_scheme}://{settings.elastic_host}:{settings.elastic_port}'])
+    service = FilmService(redis_service=None, elastic_service=ElasticService(es))
+    body = buffered if mode == 'buffered' else ndjson
+    started = time.perf_counter()
+    first_byte, size = None, 0
+    try:
+        async for chunk in body(service, ListRequest()):
+            first_byte = first_byte or time.perf_counter()
+            size += len(chunk)
+    finally:
+        await es.close()
+    return {
+        'ttfb_ms': (first_byte - started) * 1000,
+        'total_ms': (time.perf_counter() - started) * 1000,
+        'bytes': size,
+        # ru_maxrss is in kilobytes on Linux.
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    if len(sys.argv) > 1:
+        print(json.dumps(asyncio.run(run(sys.argv[1]))))
+        return
+    for mode in MODES:
+        output = subprocess.run([sys.executable, __file__, mode], capture_output=True, check=True, text=True)
+        result = json.loads(output.stdout)
+        print(
+            f'{mode:<10} ttfb {result["ttfb_ms"]:>9.1f} ms '
+            f'total {result["total_ms"]:>9.1f} ms '
+            f'peak RSS {result["peak_rss_mb"]:>8.1f} MB '
+            f'{result["bytes"]:>12} B'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -68,6 +68,15 @@ def get_json(aiohttp_session: ClientSession):
     return inner
 
 
+@pytest_asyncio.fixture
+def get_local_cache_hits(get_json):
+    async def inner() -> int:
+        _, metrics = await get_json('/api/v1/metrics/', {})
+        return metrics['local_cache']['hits']
+
+    return inner
+
+
 @pytest_asyncio.fixture(scope='session')
 async def aiohttp_session():
     async with ClientSession(test_settings.get_service_url()) as session:
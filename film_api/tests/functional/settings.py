@@ -4,6 +4,7 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class TestSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8')
+    project_name: str = Field('movies', alias='PROJECT_NAME')
     es_host: str = Field('elasticsearch', alias='ELASTIC_HOST')
     es_port: int = Field(9200, alias='ELASTIC_PORT')
     es_scheme: str = Field('http', alias='ELASTIC_SCHEME')
@@ -19,13 +19,14 @@ PERSON_SEARCH_ROUTE = f'{PERSON_ROUTE}search'
         ({'page_size': -1}, 0),
         ({'sort': '-nonexistent'}, 0),
         ({'sort': 'no_sign'}, 0),
-        ({'genre': 'nonexistent'}, 0)
+        ({'genre': 'nonexistent'}, 1)
     ]
 )
 @pytest.mark.asyncio
-async def test_film_list_cache(get_json, redis_client, query, expected_key_number):
+async def test_film_list_cache(get_json, get_local_cache_hits, redis_client, query, expected_key_number):
     await _test_redis_caching(
         get_json,
+        get_local_cache_hits,
         redis_client,
         FILMS_ROUTE,
         query,
@@ -37,13 +38,14 @@ async def test_film_list_cache(get_json, redis_client, query, expected_key_numbe
     [
         ('2a090dde-f688-46fe-a9f4-b781a985275e', 1),
         ('b9151ead-cf2f-4e14-aeb9-c4617f68848f', 1),
-        ('nonexistent', 0),
+        ('nonexistent', 1),
     ]
 )
 @pytest.mark.asyncio
-async def test_get_film_by_id_cache(get_json, redis_client, film_id, expected_key_number):
+async def test_get_film_by_id_cache(get_json, get_local_cache_hits, redis_client, film_id, expected_key_number):
     await _test_redis_caching(
         get_json,
+        get_local_cache_hits,
         redis_client,
         f'{FILMS_ROUTE}{film_id}',
         {},
@@ -54,8 +56,8 @@ async def test_get_film_by_id_cache(get_json, redis_client, film_id, expected_ke
     'search_query,expected_key_number',
     [
         ({'query': 'Star', 'page_number': 0, 'page_size': 1}, 1),
-        ({'query': 'nonexistent', 'page_number': 0, 'page_size': 1}, 0),
-        ({'query': '', 'page_number': 0, 'page_size': 1}, 0),
+        ({'query': 'nonexistent', 'page_number': 0, 'page_size': 1}, 1),
+        ({'query': '', 'page_number': 0, 'page_size': 1}, 1),
         ({'query': 'Star', 'page_number': 0, 'page_size': -1}, 0),
         ({'query': 'Star', 'page_number': 0, 'page_size': 0}, 0),
         ({'query': 'Star', 'page_number': -1, 'page_size': 1}, 0),
@@ -65,9 +67,10 @@ async def test_get_film_by_id_cache(get_json, redis_client, film_id, expected_ke
     ]
 )
 @pytest.mark.asyncio
-async def test_film_search_cache(get_json, redis_client, search_query, expected_key_number):
+async def test_film_search_cache(get_json, get_local_cache_hits, redis_client, search_query, expected_key_number):
     await _test_redis_caching(
         get_json,
+        get_local_cache_hits,
         redis_client,
         FILM_SEARCH_ROUTE,
         search_query,
@@ -77,9 +80,9 @@ async def test_film_search_cache(get_json, redis_client, search_query, expected_
 @pytest.mark.parametrize(
     'search_query,expected_key_number',
     [
-        ({'query': 'James', 'page_number': 0, 'page_size': 1}, 3),
-        ({'query': 'nonexistent', 'page_number': 0, 'page_size': 1}, 0),
-        ({'query': '', 'page_number': 0, 'page_size': 1}, 0),
+        ({'query': 'James', 'page_number': 0, 'page_size': 1}, 1),
+        ({'query': 'nonexistent', 'page_number': 0, 'page_size': 1}, 1),
+        ({'query': '', 'page_number': 0, 'page_size': 1}, 1),
         ({'query': 'James', 'page_number': 0, 'page_size': -1}, 0),
         ({'query': 'James', 'page_number': 0, 'page_size': 0}, 0),
         ({'query': 'James', 'page_number': -1, 'page_size': 1}, 0),
@@ -91,9 +94,10 @@ async def test_film_search_cache(get_json, redis_client, search_query, expected_
     ]
 )
 @pytest.mark.asyncio
-async def test_person_search_cache(get_json, redis_client, search_query, expected_key_number):
+async def test_person_search_cache(get_json, get_local_cache_hits, redis_client, search_query, expected_key_number):
     await _test_redis_caching(
         get_json,
+        get_local_cache_hits,
         redis_client,
         PERSON_SEARCH_ROUTE,
         search_query,
@@ -104,26 +108,32 @@ async def test_person_search_cache(get_json, redis_client, search_query, expecte
     'person_id,expected_key_number',
     [
         ('a18cbb60-f0ec-4a87-ad37-3e48d8cf3735', 1),
-        ('nonexistent', 0),
+        ('nonexistent', 1),
         ('', 0),
     ]
 )
 @pytest.mark.asyncio
-async def test_person_films_cache(get_json, redis_client, person_id, expected_key_number):
+async def test_person_films_cache(get_json, get_local_cache_hits, redis_client, person_id, expected_key_number):
     await _test_redis_caching(
         get_json,
+        get_local_cache_hits,
         redis_client,
         f'{PERSON_ROUTE}{person_id}/film',
         {},
         expected_key_number)
 
 
-async def _test_redis_caching(get_json, redis_client, route, query, expected_key_number):
+async def _test_redis_caching(get_json, get_local_cache_hits, redis_client, route, query, expected_key_number):
     QUERY_NUMBER = 5
     redis_client.flushdb()
     assert redis_client.dbsize() == 0
+    local_cache_hits = await get_local_cache_hits()
     tasks = []
     for _ in range(QUERY_NUMBER):
         tasks.append(get_json(route, query))
     await asyncio.gather(*tasks)
+    # Lists requested moments ago may still be in the worker's memory,
+    # and then none of the requests reaches Redis.
+    if await get_local_cache_hits() - local_cache_hits == QUERY_NUMBER:
+        expected_key_number = 0
     assert redis_client.dbsize() == expected_key_number
@@ -1,3 +1,4 @@
+import json
 from http import HTTPStatus
 
 import pytest
@@ -99,3 +100,39 @@ async def test_search_by_id(get_json, film_data, film_id, expected_status):
     status, body = await get_json(FILMS_ROUTE + film_id, {})
     assert status == expected_status
     assert body == expected[0] if expected else {'detail': 'film not found'}
+
+
+@pytest.mark.parametrize(
+    'list_request,expected_len',
+    [
+        ({}, 5),
+        ({'sort': '-imdb_rating'}, 5),
+        ({'page_size': 2, 'page_number': 1}, 2),
+    ]
+)
+@pytest.mark.asyncio
+async def test_ndjson_streaming(aiohttp_session, get_json, list_request, expected_len):
+    _, films = await get_json(FILMS_ROUTE, list_request)
+    headers = {'Accept': 'application/x-ndjson'}
+    async with aiohttp_session.get(FILMS_ROUTE, params=list_request, headers=headers) as response:
+        assert response.status == HTTPStatus.OK
+        assert response.headers['Content-Type'].startswith('application/x-ndjson')
+        streamed_films = [json.loads(line) for line in (await response.text()).splitlines()]
+    assert len(streamed_films) == expected_len
+    assert streamed_films == films
+
+
+@pytest.mark.parametrize(
+    'film_ids',
+    [
+        ['b9151ead-cf2f-4e14-aeb9-c4617f68848f', '2a090dde-f688-46fe-a9f4-b781a985275e'],
+        ['2a090dde-f688-46fe-a9f4-b781a985275e', 'nonexistent', 'b9151ead-cf2f-4e14-aeb9-c4617f68848f'],
+        ['nonexistent'],
+    ]
+)
+@pytest.mark.asyncio
+async def test_get_films_by_ids(get_json, film_data, film_ids):
+    films = {film['id']: film for film in film_data}
+    status, body = await get_json(FILMS_ROUTE, [('ids', film_id) for film_id in film_ids])
+    assert status == HTTPStatus.OK
+    assert body == [films[film_id] for film_id in film_ids if film_id in films]
@@ -69,12 +69,26 @@ async def test_genre(get_json, genre_id, result_genre):
     ]
 )
 @pytest.mark.asyncio
-async def test_redis_caching(get_json, redis_client, list_request, expected_key_number):
+async def test_redis_caching(get_json, get_local_cache_hits, redis_client, list_request, expected_key_number):
     QUERY_NUMBER = 5
     redis_client.flushdb()
     assert redis_client.dbsize() == 0
+    local_cache_hits = await get_local_cache_hits()
     tasks = []
     for _ in range(QUERY_NUMBER):
         tasks.append(get_json(GENRES_ROUTE, list_request))
     await asyncio.gather(*tasks)
+    # Lists requested moments ago may still be in the worker's memory,
+    # and then none of the requests reaches Redis.
+    if await get_local_cache_hits() - local_cache_hits == QUERY_NUMBER:
+        expected_key_number = 0
     assert redis_client.dbsize() == expected_key_number
+
+
+@pytest.mark.asyncio
+async def test_get_genres_by_ids(get_json, genre_data):
+    genre_ids = ['b92ef010-5e4c-4fd0-99d6-41b645627203', 'nonexistent', '3d8d9bf5-0d90-4353-88ba-4ccc5d2c0701']
+    genres = {genre['id']: genre for genre in genre_data}
+    status, body = await get_json(GENRES_ROUTE, [('ids', genre_id) for genre_id in genre_ids])
+    assert status == HTTPStatus.OK
+    assert [genre['id'] for genre in body] == [genre_id for genre_id in genre_ids if genre_id in genres]
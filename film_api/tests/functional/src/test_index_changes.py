@@ -0,0 +1,28 @@
+import json
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from settings import test_settings
+
+FILM_ID = '2a090dde-f688-46fe-a9f4-b781a985275e'
+
+
+@pytest.mark.asyncio
+async def test_reloaded_film_is_evicted(get_json, redis_client):
+    # Arrange
+    key = f'{test_settings.project_name}:FilmService.get_film_by_id:{FILM_ID}'
+    status, _ = await get_json(f'/api/v1/films/{FILM_ID}', {})
+    assert status == HTTPStatus.OK
+    assert redis_client.exists(key)
+
+    # Act
+    redis_client.xadd(
+        f'{test_settings.project_name}:index-changes',
+        {'index': 'movies', 'ids': json.dumps({'movies': [FILM_ID], 'person': []})}
+    )
+    await asyncio.sleep(0.5)
+
+    # Assert
+    assert not redis_client.exists(key)
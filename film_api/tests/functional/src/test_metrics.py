@@ -0,0 +1,24 @@
+from http import HTTPStatus
+
+import pytest
+
+METRICS_ROUTE = '/api/v1/metrics/'
+GENRES_ROUTE = '/api/v1/genres/'
+
+
+@pytest.mark.asyncio
+async def test_genres_are_served_from_local_cache(get_json):
+    # Arrange
+    status, _ = await get_json(GENRES_ROUTE, {'page_size': 2, 'page_number': 0})
+    assert status == HTTPStatus.OK
+    _, metrics_before = await get_json(METRICS_ROUTE, {})
+
+    # Act
+    status, _ = await get_json(GENRES_ROUTE, {'page_size': 2, 'page_number': 0})
+
+    # Assert
+    assert status == HTTPStatus.OK
+    _, metrics_after = await get_json(METRICS_ROUTE, {})
+    assert metrics_after['local_cache']['hits'] > metrics_before['local_cache']['hits']
+    assert metrics_after['local_cache']['size_bytes'] > 0
+    assert 0 <= metrics_after['redis_cache']['hit_ratio'] <= 1
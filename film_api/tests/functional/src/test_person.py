@@ -79,6 +79,21 @@ async def test_search_by_id(get_json, person_data, person_id, expected_status):
         assert body['full_name'] == expected[0]['full_name']
 
 
+@pytest.mark.parametrize(
+    'person_id',
+    [
+        'a18cbb60-f0ec-4a87-ad37-3e48d8cf3735',
+        '4d6c07c3-6ca4-48b1-8c15-4b31d8fc7321',
+    ]
+)
+@pytest.mark.asyncio
+async def test_person_films_come_from_person_document(get_json, person_data, person_id):
+    expected = [person for person in person_data if person['id'] == person_id]
+    status, body = await get_json(PERSON_ROUTE + f'/{person_id}', {})
+    assert status == HTTPStatus.OK
+    assert body['films'] == expected[0]['films']
+
+
 @pytest.mark.parametrize(
     'person_id,expected_film_number',
     [
@@ -93,3 +108,20 @@ async def test_get_person_films(get_json, person_id, expected_film_number):
     status, body = await get_json(f'{PERSON_ROUTE}/{person_id}/film', {})
     assert status == HTTPStatus.OK
     assert len(body) == expected_film_number
+
+
+@pytest.mark.parametrize(
+    'person_ids,expected_status',
+    [
+        (['4f27971e-c80a-4894-be67-721fe7ff6a7f', '4959e5b7-d157-4cdf-bc4f-5eb3cf8bd57f'], HTTPStatus.OK),
+        (['nonexistent', '4959e5b7-d157-4cdf-bc4f-5eb3cf8bd57f'], HTTPStatus.OK),
+        ([], HTTPStatus.UNPROCESSABLE_ENTITY),
+    ]
+)
+@pytest.mark.asyncio
+async def test_get_persons_by_ids(get_json, person_data, person_ids, expected_status):
+    people = {person['id']: person for person in person_data}
+    status, body = await get_json(PERSON_ROUTE + '/', [('ids', person_id) for person_id in person_ids])
+    assert status == expected_status
+    if status == HTTPStatus.OK:
+        assert body == [people[person_id] for person_id in person_ids if person_id in people]
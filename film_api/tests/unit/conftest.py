@@ -0,0 +1,52 @@
+import os
+import asyncio
+
+import pytest
+
+# Settings are read on import; unit tests talk to no real services.
+os.environ.setdefault('REDIS_HOST', 'localhost')
+os.environ.setdefault('ELASTIC_HOST', 'localhost')
+
+from core.config import settings  # noqa: E402
+from services.cache_keys import CacheNamespace, get_cache_key  # noqa: E402
+from services.codecs import ValueType  # noqa: E402
+from services.redis import RedisService  # noqa: E402
+from services.single_flight import SingleFlight  # noqa: E402
+
+
+class Fetch:
+    """Stands in for a cached method's fetch and counts its calls."""
+
+    def __init__(self, value, delay: float = 0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+@pytest.fixture
+def namespace() -> CacheNamespace:
+    return CacheNamespace('TestService.get_titles', 'movies', ValueType(list[str]), False)
+
+
+@pytest.fixture
+def cache_key(namespace: CacheNamespace) -> str:
+    """Key of ``namespace`` called without arguments, at generation 0."""
+    return get_cache_key(settings.project_name, namespace, 0, (), {})
+
+
+@pytest.fixture
+def make_fetch():
+    return Fetch
+
+
+@pytest.fixture
+def make_redis_service():
+    def inner(redis, lock_timeout_ms: int = 1000, lock_poll_interval_ms: int = 10, **options) -> RedisService:
+        return RedisService(redis, 30, SingleFlight(), lock_timeout_ms, lock_poll_interval_ms, **options)
+
+    return inner
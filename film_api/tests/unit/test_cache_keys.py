@@ -0,0 +1,96 @@
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from models.common import ListRequest
+from services.cache_keys import CacheNamespace, Generations, get_cache_key, get_generation_key
+from services.codecs import ValueType
+
+NAMESPACE = CacheNamespace('FilmService.get_film_list', 'movies', ValueType(list[str]), False)
+ID_NAMESPACE = CacheNamespace('FilmService.get_film_by_id', 'movies', ValueType(str | None), False, 'movies')
+
+
+def test_key_is_readable():
+    key = get_cache_key('movies', NAMESPACE, 3, (), {'query': 'Star'})
+    project, name, generation, digest = key.split(':')
+    assert (project, name, generation) == ('movies', 'FilmService.get_film_list', 'g3')
+    assert len(digest) == 40
+
+
+def test_reordered_kwargs_give_equal_keys():
+    assert (
+        get_cache_key('movies', NAMESPACE, 0, (), {'query': 'Star', 'page_size': 10})
+        == get_cache_key('movies', NAMESPACE, 0, (), {'page_size': 10, 'query': 'Star'})
+    )
+
+
+def test_equal_models_give_equal_keys():
+    assert (
+        get_cache_key('movies', NAMESPACE, 0, (ListRequest(query='Action', page_size=10),), {})
+        == get_cache_key('movies', NAMESPACE, 0, (ListRequest(page_size=10, query='Action'),), {})
+    )
+
+
+def test_tuples_and_lists_give_equal_keys():
+    assert (
+        get_cache_key('movies', NAMESPACE, 0, (('a', 'b'),), {})
+        == get_cache_key('movies', NAMESPACE, 0, (['a', 'b'],), {})
+    )
+
+
+@pytest.mark.parametrize(
+    'args,kwargs',
+    [
+        ((), {'query': 'Wars'}),
+        ((), {'query': 'Star', 'page_size': 20}),
+        (('Star',), {}),
+        ((ListRequest(query='Comedy'),), {}),
+    ]
+)
+def test_other_arguments_give_other_keys(args, kwargs):
+    assert (
+        get_cache_key('movies', NAMESPACE, 0, args, kwargs)
+        != get_cache_key('movies', NAMESPACE, 0, (), {'query': 'Star'})
+    )
+
+
+def test_generation_changes_the_key():
+    assert (
+        get_cache_key('movies', NAMESPACE, 1, (), {'query': 'Star'})
+        != get_cache_key('movies', NAMESPACE, 0, (), {'query': 'Star'})
+    )
+
+
+def test_id_key_skips_the_generation():
+    assert get_cache_key('movies', ID_NAMESPACE, 5, ('42',), {}) == 'movies:FilmService.get_film_by_id:42'
+    assert get_cache_key('movies', ID_NAMESPACE, 5, (), {'film_id': '42'}) == 'movies:FilmService.get_film_by_id:42'
+
+
+@pytest.mark.asyncio
+async def test_generation_bump_changes_the_key():
+    # Arrange
+    redis = FakeAsyncRedis()
+    generations = Generations('movies', ttl=60)
+    key_before = get_cache_key('movies', NAMESPACE, await generations.get(redis, 'movies'), (), {})
+
+    # Act: the ETL bumps the generation and reports the change.
+    await redis.incr(get_generation_key('movies', 'movies'))
+    generations.invalidate('movies')
+
+    # Assert
+    assert await generations.get(redis, 'movies') == 1
+    assert get_cache_key('movies', NAMESPACE, await generations.get(redis, 'movies'), (), {}) != key_before
+
+
+@pytest.mark.asyncio
+async def test_generation_is_reread_after_ttl():
+    redis = FakeAsyncRedis()
+    generations = Generations('movies', ttl=60)
+    assert await generations.get(redis, 'movies') == 0
+
+    await redis.incr(get_generation_key('movies', 'movies'))
+
+    # Within the ttl the counter is not read again.
+    assert await generations.get(redis, 'movies') == 0
+    generations.ttl = 0
+    assert await generations.get(redis, 'movies') == 1
+    assert await generations.get(redis, 'genre') == 0
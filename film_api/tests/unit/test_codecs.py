@@ -0,0 +1,57 @@
+import zlib
+
+import pytest
+
+from models.film import FilmItem
+from services.codecs import CacheEntry, JsonCodec, ValueType
+
+FILMS = [FilmItem(id=str(i), title=f'Film {i}', imdb_rating=7.5) for i in range(20)]
+FILMS_TYPE = ValueType(list[FilmItem])
+
+
+@pytest.mark.parametrize('compress_min_bytes', [0, 2 ** 62])
+def test_round_trip(compress_min_bytes):
+    codec = JsonCodec(compress_min_bytes)
+    entry = CacheEntry(FILMS, 1000.0, 0.25)
+
+    assert codec.decode(codec.encode(entry, FILMS_TYPE), FILMS_TYPE) == entry
+
+
+def test_compresses_large_values():
+    data = JsonCodec(compress_min_bytes=0).encode(CacheEntry(FILMS, 0.0, 0.0), FILMS_TYPE)
+    assert data[1] & JsonCodec.COMPRESSED
+    assert len(data) < len(JsonCodec(compress_min_bytes=2 ** 62).encode(CacheEntry(FILMS, 0.0, 0.0), FILMS_TYPE))
+
+
+def test_version_mismatch_is_a_miss():
+    codec = JsonCodec(compress_min_bytes=0)
+    data = codec.encode(CacheEntry(FILMS, 0.0, 0.0), FILMS_TYPE)
+
+    assert codec.decode(bytes([JsonCodec.VERSION + 1]) + data[1:], FILMS_TYPE) is None
+
+
+def test_schema_mismatch_is_a_miss():
+    codec = JsonCodec(compress_min_bytes=0)
+    data = codec.encode(CacheEntry(FILMS, 0.0, 0.0), FILMS_TYPE)
+
+    assert codec.decode(data, ValueType(FilmItem)) is None
+
+
+def test_corrupt_zlib_payload_is_a_miss():
+    codec = JsonCodec(compress_min_bytes=0)
+    data = codec.encode(CacheEntry(FILMS, 0.0, 0.0), FILMS_TYPE)
+    header, payload = data[:JsonCodec.HEADER.size], data[JsonCodec.HEADER.size:]
+
+    assert codec.decode(header + payload[:len(payload) // 2], FILMS_TYPE) is None
+    assert codec.decode(header + b'not zlib', FILMS_TYPE) is None
+
+
+def test_invalid_json_payload_is_a_miss():
+    codec = JsonCodec(compress_min_bytes=0)
+    data = codec.encode(CacheEntry(FILMS, 0.0, 0.0), FILMS_TYPE)
+
+    assert codec.decode(data[:JsonCodec.HEADER.size] + zlib.compress(b'[{"id": 1'), FILMS_TYPE) is None
+
+
+def test_truncated_header_is_a_miss():
+    assert JsonCodec(compress_min_bytes=0).decode(b'\x01\x00', FILMS_TYPE) is None
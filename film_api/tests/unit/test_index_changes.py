@@ -0,0 +1,120 @@
+import json
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from fakeredis import FakeAsyncRedis
+
+from services import index_changes
+from services.index_changes import (
+    INDEX_CHANGES_LAST_ID_KEY, INDEX_CHANGES_STREAM, get_stream_last_id, listen_for_index_changes
+)
+
+FILM_ID = '2a090dde-f688-46fe-a9f4-b781a985275e'
+
+
+@pytest.mark.asyncio
+async def test_stream_last_id_without_stream():
+    assert await get_stream_last_id(FakeAsyncRedis()) == '0-0'
+
+
+@pytest.mark.asyncio
+async def test_stream_last_id():
+    redis = FakeAsyncRedis()
+    message_id = await redis.xadd(INDEX_CHANGES_STREAM, {'index': 'movies', 'ids': '{}'})
+    assert await get_stream_last_id(redis) == message_id.decode()
+
+
+@pytest.mark.asyncio
+async def test_message_published_between_timed_out_reads_is_handled(monkeypatch):
+    # Arrange
+    redis = FakeAsyncRedis()
+    await redis.xadd(INDEX_CHANGES_STREAM, {'index': 'genre', 'ids': json.dumps({'genre': []})})
+    evicted = asyncio.Queue()
+
+    async def evict_changed_documents(_, index, ids):
+        await evicted.put((index, ids))
+
+    xread = redis.xread
+    reads = 0
+
+    async def xread_timing_out_once(streams, count=None, block=None):
+        nonlocal reads
+        reads += 1
+        if reads == 1:
+            # The ETL publishes after the first read timed out.
+            await redis.xadd(INDEX_CHANGES_STREAM, {'index': 'movies', 'ids': json.dumps({'movies': [FILM_ID]})})
+            return []
+        return await xread(streams, count=count, block=100)
+
+    monkeypatch.setattr(index_changes, 'evict_changed_documents', evict_changed_documents)
+    monkeypatch.setattr(redis, 'xread', xread_timing_out_once)
+
+    # Act
+    listener = asyncio.create_task(listen_for_index_changes(redis))
+    try:
+        change = await asyncio.wait_for(evicted.get(), 1)
+    finally:
+        listener.cancel()
+
+    # Assert: older messages are not replayed, the new one is not skipped.
+    assert change == ('movies', {'movies': [FILM_ID]})
+
+
+@pytest.mark.asyncio
+async def test_failed_eviction_is_retried(monkeypatch):
+    # Arrange
+    redis = FakeAsyncRedis()
+    evicted = asyncio.Queue()
+    attempts = 0
+
+    async def evict_changed_documents(_, index, ids):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RedisConnectionError('Redis went away')
+        await evicted.put((index, ids))
+
+    monkeypatch.setattr(index_changes, 'evict_changed_documents', evict_changed_documents)
+    listener = asyncio.create_task(listen_for_index_changes(redis))
+    try:
+        await asyncio.sleep(0.05)
+
+        # Act
+        await redis.xadd(INDEX_CHANGES_STREAM, {'index': 'movies', 'ids': json.dumps({'movies': [FILM_ID]})})
+        change = await asyncio.wait_for(evicted.get(), 3)
+    finally:
+        listener.cancel()
+
+    # Assert
+    assert change == ('movies', {'movies': [FILM_ID]})
+    assert attempts == 2
+    assert await redis.get(INDEX_CHANGES_LAST_ID_KEY) is not None
+
+
+@pytest.mark.asyncio
+async def test_malformed_message_is_skipped(monkeypatch):
+    # Arrange
+    redis = FakeAsyncRedis()
+    evicted = asyncio.Queue()
+
+    async def evict_changed_documents(_, index, ids):
+        await evicted.put((index, ids))
+
+    monkeypatch.setattr(index_changes, 'evict_changed_documents', evict_changed_documents)
+    listener = asyncio.create_task(listen_for_index_changes(redis))
+    try:
+        await asyncio.sleep(0.05)
+
+        # Act
+        await redis.xadd(INDEX_CHANGES_STREAM, {'index': 'movies', 'ids': 'not json'})
+        await redis.xadd(INDEX_CHANGES_STREAM, {'ids': json.dumps({'movies': [FILM_ID]})})
+        await redis.xadd(INDEX_CHANGES_STREAM, {'index': 'movies', 'ids': json.dumps([FILM_ID])})
+        await redis.xadd(INDEX_CHANGES_STREAM, {'index': 'movies', 'ids': json.dumps({'movies': [FILM_ID]})})
+        change = await asyncio.wait_for(evicted.get(), 1)
+    finally:
+        listener.cancel()
+
+    # Assert
+    assert change == ('movies', {'movies': [FILM_ID]})
+    assert evicted.empty()
@@ -0,0 +1,89 @@
+import pytest
+
+from models.common import ListRequest, SearchRequest
+from services.queries import get_exact_query, get_nested_query, get_search_query, with_source
+
+PERSON_FIELDS = ['actors.id', 'directors.id', 'writers.id']
+
+
+@pytest.mark.parametrize(
+    'request_params,expected_body',
+    [
+        ({}, {'query': {'match_all': {}}, 'track_total_hits': False}),
+        (
+                {'query': 'Action'},
+                {'query': {'bool': {'filter': [{'term': {'genres': 'Action'}}]}}, 'track_total_hits': False}
+        ),
+        (
+                {'page_number': 2, 'page_size': 10, 'sort': '-imdb_rating'},
+                {
+                    'query': {'match_all': {}},
+                    'track_total_hits': False,
+                    'size': 10,
+                    'from': 20,
+                    'sort': [{'imdb_rating': 'desc'}]
+                }
+        ),
+        (
+                {'page_number': 0, 'sort': '+title'},
+                {'query': {'match_all': {}}, 'track_total_hits': False, 'sort': [{'title': 'asc'}]}
+        ),
+    ]
+)
+def test_exact_query(request_params, expected_body):
+    assert get_exact_query(ListRequest(**request_params), ['genres']) == expected_body
+
+
+def test_exact_query_matches_any_field():
+    body = get_exact_query(ListRequest(query='Action'), ['genres', 'name'])
+    assert body['query'] == {'bool': {'filter': [{'bool': {'should': [
+        {'term': {'genres': 'Action'}},
+        {'term': {'name': 'Action'}}
+    ]}}]}}
+
+
+def test_exact_query_ignores_query_without_fields():
+    assert get_exact_query(ListRequest(query='Action'), [])['query'] == {'match_all': {}}
+
+
+def test_exact_query_is_not_scored():
+    body = get_exact_query(ListRequest(query='Action', sort='-imdb_rating'), ['genres'])
+    assert 'should' not in body['query']['bool']
+    assert 'must' not in body['query']['bool']
+
+
+def test_search_query():
+    body = get_search_query(SearchRequest(query='Star', page_number=1, page_size=5), ['title', 'description'])
+    assert body == {
+        'from': 5,
+        'size': 5,
+        'query': {'bool': {'should': [{'match': {'title': 'Star'}}, {'match': {'description': 'Star'}}]}},
+        'track_total_hits': False
+    }
+
+
+def test_nested_query():
+    body = get_nested_query(['a', 'b'], PERSON_FIELDS)
+    assert body == {
+        'query': {'bool': {'filter': [{'bool': {'should': [
+            {'nested': {'path': 'actors', 'query': {'terms': {'actors.id': ['a', 'b']}}}},
+            {'nested': {'path': 'directors', 'query': {'terms': {'directors.id': ['a', 'b']}}}},
+            {'nested': {'path': 'writers', 'query': {'terms': {'writers.id': ['a', 'b']}}}}
+        ]}}]}},
+        'track_total_hits': False
+    }
+
+
+@pytest.mark.parametrize(
+    'source,expected_source',
+    [
+        (None, None),
+        ([], []),
+        (['id', 'title'], ['id', 'title']),
+    ]
+)
+def test_with_source(source, expected_source):
+    query = get_exact_query(ListRequest(), [])
+    body = with_source(query, source)
+    assert body.get('_source') == expected_source
+    assert '_source' not in query
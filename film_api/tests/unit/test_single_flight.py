@@ -0,0 +1,86 @@
+import time
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_call(make_fetch):
+    single_flight = SingleFlight()
+    fetch = make_fetch(['Star Wars'], delay=0.05)
+
+    results = await asyncio.gather(*(single_flight.do('key', fetch) for _ in range(10)))
+
+    assert results == [['Star Wars']] * 10
+    assert fetch.calls == 1
+    assert 'key' not in single_flight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_a_cancelled_caller(make_fetch):
+    single_flight = SingleFlight()
+    fetch = make_fetch(['Star Wars'], delay=0.05)
+    first = asyncio.create_task(single_flight.do('key', fetch))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(single_flight.do('key', fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+
+    assert await second == ['Star Wars']
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_fetch_once(namespace, cache_key, make_fetch, make_redis_service):
+    # Two replicas with their own single flight share one Redis.
+    redis = FakeAsyncRedis()
+    replicas = [make_redis_service(redis), make_redis_service(redis)]
+    fetch = make_fetch(['Star Wars'], delay=0.05)
+
+    results = await asyncio.gather(*(
+        replica.get_or_fetch(fetch, namespace)
+        for replica in replicas
+        for _ in range(5)
+    ))
+
+    assert results == [['Star Wars']] * 10
+    assert fetch.calls == 1
+    assert not await redis.exists(f'{cache_key}:lock')
+
+
+@pytest.mark.asyncio
+async def test_waiter_fetches_after_lock_holder_times_out(namespace, cache_key, make_fetch, make_redis_service):
+    # Arrange: a replica took the lock and never fills the cache.
+    redis = FakeAsyncRedis()
+    await redis.set(f'{cache_key}:lock', 'other-replica')
+    fetch = make_fetch(['Star Wars'])
+    started = time.monotonic()
+
+    # Act
+    value = await make_redis_service(redis, lock_timeout_ms=100).get_or_fetch(fetch, namespace)
+
+    # Assert: the waiter gave up after the lock timeout and fetched itself.
+    assert value == ['Star Wars']
+    assert fetch.calls == 1
+    assert time.monotonic() - started >= 0.09
+    assert await redis.exists(cache_key)
+    assert await redis.get(f'{cache_key}:lock') == b'other-replica'
+
+
+@pytest.mark.asyncio
+async def test_waiter_fetches_once_lock_is_gone_without_value(namespace, cache_key, make_fetch, make_redis_service):
+    # The lock holder failed: its lock expires without a cached value.
+    redis = FakeAsyncRedis()
+    await redis.set(f'{cache_key}:lock', 'other-replica', px=50)
+    fetch = make_fetch(['Star Wars'])
+    started = time.monotonic()
+
+    value = await make_redis_service(redis, lock_timeout_ms=5000).get_or_fetch(fetch, namespace)
+
+    assert value == ['Star Wars']
+    assert fetch.calls == 1
+    assert time.monotonic() - started < 1
@@ -0,0 +1,110 @@
+import time
+import asyncio
+import random
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from services.codecs import CacheEntry
+from services.redis import cache_codec, refresh_tasks
+
+
+@pytest.fixture
+def redis() -> FakeAsyncRedis:
+    return FakeAsyncRedis()
+
+
+@pytest.fixture
+def store(redis, namespace, cache_key):
+    async def inner(value, fresh_for: float, fetch_seconds: float = 0.01):
+        entry = CacheEntry(value, time.time() + fresh_for, fetch_seconds)
+        await redis.set(cache_key, cache_codec.encode(entry, namespace.value_type))
+
+    return inner
+
+
+@pytest.fixture
+def read(redis, namespace, cache_key):
+    async def inner() -> CacheEntry:
+        return cache_codec.decode(await redis.get(cache_key), namespace.value_type)
+
+    return inner
+
+
+@pytest.fixture
+def service(redis, make_redis_service):
+    return make_redis_service(redis, stale_ttl=300, early_refresh_beta=1.0)
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_served_without_refresh(monkeypatch, namespace, store, service, make_fetch):
+    await store(['Cached'], fresh_for=10)
+    # The smallest head start XFetch can draw.
+    monkeypatch.setattr(random, 'random', lambda: 0.0)
+    fetch = make_fetch(['Fetched'])
+
+    assert await service.get_or_fetch(fetch, namespace) == ['Cached']
+    assert not refresh_tasks
+    assert fetch.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_and_refreshed(redis, namespace, cache_key, store, read, service, make_fetch):
+    # Arrange
+    await store(['Stale'], fresh_for=-1)
+    fetch = make_fetch(['Fetched'])
+
+    # Act
+    value = await service.get_or_fetch(fetch, namespace)
+    await asyncio.gather(*refresh_tasks)
+
+    # Assert
+    assert value == ['Stale']
+    assert fetch.calls == 1
+    entry = await read()
+    assert entry.value == ['Fetched']
+    assert entry.fresh_until > time.time() + 29
+    assert 30 < await redis.ttl(cache_key) <= 330
+
+
+@pytest.mark.asyncio
+async def test_early_refresh_serves_the_cached_value(monkeypatch, namespace, store, read, service, make_fetch):
+    # Arrange: fresh for 10 more seconds, but slow to fetch.
+    await store(['Cached'], fresh_for=10, fetch_seconds=5)
+    # Draws a head start of about 5 * 14 seconds.
+    monkeypatch.setattr(random, 'random', lambda: 1 - 1e-6)
+    fetch = make_fetch(['Fetched'])
+
+    # Act
+    value = await service.get_or_fetch(fetch, namespace)
+    await asyncio.gather(*refresh_tasks)
+
+    # Assert
+    assert value == ['Cached']
+    assert fetch.calls == 1
+    assert (await read()).value == ['Fetched']
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stale_reads_refresh_once(namespace, store, service, make_fetch):
+    await store(['Stale'], fresh_for=-1)
+    fetch = make_fetch(['Fetched'])
+
+    values = await asyncio.gather(*(service.get_or_fetch(fetch, namespace) for _ in range(10)))
+    await asyncio.gather(*refresh_tasks)
+
+    assert values == [['Stale']] * 10
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_gives_way_to_another_replica(redis, namespace, cache_key, store, read, service, make_fetch):
+    await store(['Stale'], fresh_for=-1)
+    await redis.set(f'{cache_key}:lock', 'other-replica')
+    fetch = make_fetch(['Fetched'])
+
+    assert await service.get_or_fetch(fetch, namespace) == ['Stale']
+    await asyncio.gather(*refresh_tasks)
+
+    assert fetch.calls == 0
+    assert (await read()).value == ['Stale']
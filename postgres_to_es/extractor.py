@@ -90,12 +90,26 @@ class PostgresExtractor:
         return self.cursor.fetchall()
 
     def get_persons(self, ids: list[str]) -> list:
-        query = f"""
-                SELECT DISTINCT id, full_name
-                FROM content.person
-                WHERE content.person.id IN {tuple(ids)};
+        query = """
+                SELECT
+                p.id, p.full_name,
+                COALESCE (
+                       json_agg(
+                           json_build_object('id', pf.film_work_id, 'roles', pf.roles)
+                           ORDER BY pf.film_work_id
+                       ) FILTER (WHERE pf.film_work_id is not null),
+                       '[]'
+                ) AS films
+                FROM content.person p
+                LEFT JOIN (
+                    SELECT person_id, film_work_id, array_agg(DISTINCT role) AS roles
+                    FROM content.person_film_work
+                    GROUP BY person_id, film_work_id
+                ) pf ON pf.person_id = p.id
+                WHERE p.id = ANY(%s::uuid[])
+                GROUP BY p.id;
         """
-        self.cursor.execute(query)
+        self.cursor.execute(query, (list(ids),))
         return self.cursor.fetchall()
 
     def get_full_film_work_info(self, film_work_ids: list[str]) -> list:
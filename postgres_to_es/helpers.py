@@ -5,6 +5,23 @@ import psycopg2
 from elasticsearch import Elasticsearch
 from psycopg2.extras import DictCursor
 
+# Filmography of a person: the films they took part in and their roles there.
+person_films_es_mapping = {
+    "films": {
+        "type": "nested",
+        "dynamic": "strict",
+        "properties": {
+            "id": {
+                "type": "keyword"
+            },
+            "roles": {
+                "type": "keyword"
+            }
+        }
+    }
+}
+PERSON_ROLES = ("actor", "writer", "director")
+
 genres_es_schema = {
     "settings": {
         "refresh_interval": "1s",
@@ -114,7 +131,8 @@ persons_es_schema = {
             "full_name": {
                 "type": "text",
                 "analyzer": "ru_en"
-            }
+            },
+            **person_films_es_mapping
         }
     }
 }
@@ -273,7 +291,16 @@ def persons_postgres_to_elastic(pg_raw_data: list) -> list:
     for data in pg_raw_data:
         full_data = {
             "id": str(data['id']),
-            "full_name": data['full_name']
+            "full_name": data['full_name'],
+            # Like the film casts, filmographies leave out any other roles.
+            "films": [
+                {
+                    "id": str(film["id"]),
+                    "roles": [role for role in PERSON_ROLES if role in film["roles"]]
+                }
+                for film in data['films']
+                if any(role in PERSON_ROLES for role in film["roles"])
+            ]
         }
         transformed_data.append(full_data)
     return transformed_data
@@ -334,7 +361,13 @@ def postgres_to_elastic(pg_raw_data: list) -> list:
     return transformed_data
 
 
-def create_indexes_if_not_exists(host) -> None:
+def create_indexes_if_not_exists(host) -> list[str]:
+    """Creates missing indexes and adds new fields to existing ones.
+
+    Returns the names of the indexes given new fields, whose documents
+    all have to be reloaded to fill them.
+    """
+    extended_indexes = []
     with Elasticsearch(host) as client:
         if not client.indices.exists(index="movies"):
             logging.info("There is no index with name 'movies', creating...")
@@ -345,3 +378,8 @@ def create_indexes_if_not_exists(host) -> None:
         if not client.indices.exists(index="person"):
             logging.info("There is no index with name 'person', creating...")
             client.indices.create(index="person", body=persons_es_schema)
+        elif "films" not in client.indices.get_mapping(index="person")["person"]["mappings"]["properties"]:
+            logging.info("Index 'person' has no films field, adding...")
+            client.indices.put_mapping(index="person", properties=person_films_es_mapping)
+            extended_indexes.append("person")
+    return extended_indexes
@@ -1,12 +1,23 @@
+import json
 import logging
 
 import backoff
+from redis import Redis, RedisError
 from elasticsearch import Elasticsearch, ApiError, TransportError, helpers
 
+# Read by the film API, which evicts the cached documents listed here
+# (see film_api/src/services/index_changes.py).
+INDEX_CHANGES_STREAM = "{project}:index-changes"
+INDEX_CHANGES_MAXLEN = 10000
+GENERATION_KEY = "{project}:generation:{index}"
+CAST_FIELDS = ("actors", "writers", "directors")
+
 
 class ElasticSearchLoader:
-    def __init__(self, es_client: Elasticsearch):
+    def __init__(self, es_client: Elasticsearch, redis_client: Redis | None = None, project: str = "movies"):
         self.es_client = es_client
+        self.redis_client = redis_client
+        self.project = project
 
     @backoff.on_exception(wait_gen=backoff.expo, exception=(ApiError, TransportError))
     def load_data(self, data: list[dict], index_name: str) -> None:
@@ -18,5 +29,59 @@ class ElasticSearchLoader:
                     "_source": doc,
                 }
 
+        # People dropped from a film's cast are only found in the film as indexed before.
+        former_cast_ids = self.get_cast_ids([doc["id"] for doc in data]) \
+            if index_name == "movies" and data and self.redis_client else set()
         helpers.bulk(self.es_client, generate_docs())
         logging.info(f"Loading to ElasticSearch (index: {index_name}) successfully.")
+        if data and self.redis_client:
+            self.publish_changes(data, index_name, former_cast_ids)
+
+    def get_cast_ids(self, film_ids: list[str]) -> set[str]:
+        """Ids of the people in the cast of the films as they are indexed now."""
+        response = self.es_client.mget(
+            index="movies",
+            ids=film_ids,
+            source_includes=[f"{field}.id" for field in CAST_FIELDS],
+        )
+        return {
+            person["id"]
+            for doc in response["docs"] if doc.get("found")
+            for field in CAST_FIELDS for person in doc["_source"].get(field) or []
+        }
+
+    @backoff.on_exception(wait_gen=backoff.expo, exception=(ApiError, TransportError))
+    def get_person_ids_by_film_ids(self, film_ids: list[str]) -> set[str]:
+        """Ids of the people whose indexed filmography lists any of the films."""
+        hits = helpers.scan(
+            self.es_client,
+            index="person",
+            query={
+                "query": {"nested": {"path": "films", "query": {"terms": {"films.id": film_ids}}}},
+                "_source": False,
+            },
+        )
+        return {hit["_id"] for hit in hits}
+
+    @backoff.on_exception(wait_gen=backoff.expo, exception=RedisError, max_tries=5, raise_on_giveup=False)
+    def publish_changes(self, data: list[dict], index_name: str, former_cast_ids: set[str] = frozenset()) -> None:
+        """Bumps the index generation and lists the reloaded documents on the changes stream.
+
+        Film documents also list their cast, current and former, whose person
+        films have changed with them.
+        """
+        ids = {index_name: [doc["id"] for doc in data]}
+        if index_name == "movies":
+            ids["person"] = sorted({
+                person["id"] for doc in data for field in CAST_FIELDS for person in doc.get(field) or []
+            } | former_cast_ids)
+        with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(GENERATION_KEY.format(project=self.project, index=index_name))
+            pipe.xadd(
+                INDEX_CHANGES_STREAM.format(project=self.project),
+                {"index": index_name, "ids": json.dumps(ids)},
+                maxlen=INDEX_CHANGES_MAXLEN,
+                approximate=True
+            )
+            pipe.execute()
+        logging.info(f"Published {len(data)} changed documents (index: {index_name}).")
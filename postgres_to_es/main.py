@@ -1,15 +1,17 @@
 import logging
 import os
+from datetime import datetime
 from time import sleep
 
 from dotenv import load_dotenv
 from psycopg2.extensions import connection as _connection
 from elasticsearch import Elasticsearch
+from redis import Redis
 
 from extractor import PostgresExtractor
 from helpers import pg_conn_context, postgres_to_elastic, create_indexes_if_not_exists, genres_postgres_to_elastic, \
     persons_postgres_to_elastic
-from loader import ElasticSearchLoader
+from loader import ElasticSearchLoader, CAST_FIELDS
 from state_warehouse import State, JsonFileStorage
 
 load_dotenv()
@@ -17,16 +19,29 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
 
-def start_etl_process(pg_connection: _connection, es_client: Elasticsearch, state: State):
-    for table_name, raw_pg_film_data, table_data in PostgresExtractor(pg_connection, state).extract_data():
+def start_etl_process(pg_connection: _connection, es_client: Elasticsearch, state: State, redis_client: Redis):
+    loader = ElasticSearchLoader(es_client, redis_client, os.environ.get("PROJECT_NAME") or "movies")
+    extractor = PostgresExtractor(pg_connection, state)
+    for table_name, raw_pg_film_data, table_data in extractor.extract_data():
         ready_full_films_data = postgres_to_elastic(raw_pg_film_data)
         if table_name == "genre":
             genres_data = genres_postgres_to_elastic(table_data)
-            ElasticSearchLoader(es_client).load_data(genres_data, index_name="genre")
+            loader.load_data(genres_data, index_name="genre")
         if table_name == "person":
             persons_data = persons_postgres_to_elastic(table_data)
-            ElasticSearchLoader(es_client).load_data(persons_data, index_name="person")
-        ElasticSearchLoader(es_client).load_data(ready_full_films_data, index_name="movies")
+            loader.load_data(persons_data, index_name="person")
+        loader.load_data(ready_full_films_data, index_name="movies")
+        if table_name == "film_work" and ready_full_films_data:
+            reload_filmographies(extractor, loader, ready_full_films_data)
+
+
+def reload_filmographies(extractor: PostgresExtractor, loader: ElasticSearchLoader, films_data: list[dict]) -> None:
+    """Reloads the people whose filmography changed with the films: their cast now and before."""
+    person_ids = {person["id"] for film in films_data for field in CAST_FIELDS for person in film[field]}
+    person_ids |= loader.get_person_ids_by_film_ids([film["id"] for film in films_data])
+    if person_ids:
+        persons_data = persons_postgres_to_elastic(extractor.get_persons(sorted(person_ids)))
+        loader.load_data(persons_data, index_name="person")
 
 
 if __name__ == '__main__':
@@ -42,10 +57,13 @@ if __name__ == '__main__':
         logging.info("Starting ETL process.")
         state = State(JsonFileStorage("state.json"))
         ELASTIC_SEARCH_STRING = f"http://{os.environ.get('ELASTIC_HOST')}:{os.environ.get('ELASTIC_PORT')}"
-        create_indexes_if_not_exists(ELASTIC_SEARCH_STRING)
+        for index_name in create_indexes_if_not_exists(ELASTIC_SEARCH_STRING):
+            state.set_state(f"{index_name}_modified", str(datetime.min))
         elastic_client = Elasticsearch(ELASTIC_SEARCH_STRING)
+        redis_client = Redis(host=os.environ.get("REDIS_HOST"), port=int(os.environ.get("REDIS_PORT", 6379)))
         with pg_conn_context(dsl) as pg_conn:
-            start_etl_process(pg_conn, elastic_client, state)
+            start_etl_process(pg_conn, elastic_client, state, redis_client)
+        redis_client.close()
         logging.info(
-            f"ETL finished successfully. Next ETL will be in {int(os.environ.get("ITERATION_DELAY"))} seconds.")
+            f"ETL finished successfully. Next ETL will be in {int(os.environ.get('ITERATION_DELAY'))} seconds.")
         sleep(int(os.environ.get("ITERATION_DELAY")))
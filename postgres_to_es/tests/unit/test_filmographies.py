@@ -0,0 +1,70 @@
+from extractor import PostgresExtractor
+from main import reload_filmographies
+
+FILM_ID = 'b1f1a3a4-2c1d-4c52-9a3c-3f1c7c0e0a01'
+PERSON_ID = 'c2a2b4b5-3d2e-4d63-8b4d-4a2d8d1f1b02'
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+class FakeLoader:
+    def __init__(self, former_cast_ids=()):
+        self.former_cast_ids = set(former_cast_ids)
+        self.loaded = []
+
+    def get_person_ids_by_film_ids(self, film_ids):
+        return self.former_cast_ids
+
+    def load_data(self, data, index_name):
+        self.loaded.append((index_name, data))
+
+
+def make_extractor(rows):
+    cursor = FakeCursor(rows)
+    return PostgresExtractor(FakeConnection(cursor), state=None), cursor
+
+
+def test_reload_one_person_cast():
+    extractor, cursor = make_extractor(
+        [{'id': PERSON_ID, 'full_name': 'Solo Actor', 'films': [{'id': FILM_ID, 'roles': ['actor']}]}]
+    )
+    loader = FakeLoader()
+    film = {'id': FILM_ID, 'actors': [{'id': PERSON_ID, 'name': 'Solo Actor'}], 'writers': [], 'directors': []}
+
+    reload_filmographies(extractor, loader, [film])
+
+    [(query, params)] = cursor.executed
+    assert 'ANY(%s::uuid[])' in query
+    assert params == ([PERSON_ID],)
+    assert loader.loaded == [
+        ('person', [{'id': PERSON_ID, 'full_name': 'Solo Actor', 'films': [{'id': FILM_ID, 'roles': ['actor']}]}])
+    ]
+
+
+def test_reload_only_former_cast():
+    extractor, cursor = make_extractor([{'id': PERSON_ID, 'full_name': 'Former Actor', 'films': []}])
+    loader = FakeLoader(former_cast_ids={PERSON_ID})
+    film = {'id': FILM_ID, 'actors': [], 'writers': [], 'directors': []}
+
+    reload_filmographies(extractor, loader, [film])
+
+    assert cursor.executed[0][1] == ([PERSON_ID],)
+    assert loader.loaded == [('person', [{'id': PERSON_ID, 'full_name': 'Former Actor', 'films': []}])]